@@ -3,7 +3,7 @@ Base Agent Class - Common functionality for all specialized agents
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import logging
 import asyncio
 from datetime import datetime
@@ -40,12 +40,19 @@ class BaseAgent(ABC):
     
     def initialize_mcp_client(self, user_id: str, session_id: Optional[str] = None):
         """Initialize MCP client for this agent"""
+        mcp_client = self.create_mcp_client(user_id, session_id)
+        if mcp_client:
+            self.mcp_client = mcp_client
+            logger.info(f"✅ MCP client initialized for {self.agent_name}")
+    
+    def create_mcp_client(self, user_id: str, session_id: Optional[str] = None):
+        """Create a per-request MCP client without binding it to the agent"""
         try:
             from app.mcp.mcp_client import MCPClient
-            self.mcp_client = MCPClient(user_id, session_id)
-            logger.info(f"✅ MCP client initialized for {self.agent_name}")
+            return MCPClient(user_id, session_id)
         except Exception as e:
             logger.warning(f"⚠️ MCP client not available for {self.agent_name}: {str(e)}")
+            return None
     
     async def use_mcp_tool(self, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Use an MCP tool through the client"""
@@ -100,6 +107,13 @@ class BaseAgent(ABC):
             raise RuntimeError("MCP client not initialized")
         return await self.mcp_client.get_health_insights(user_data, **kwargs)
     
+    async def get_health_insights_snapshot(self, user_data: Dict[str, Any], **kwargs) -> Tuple[bool, Dict[str, Any]]:
+        """Get health insights using MCP as a (success, result) pair"""
+        insights = await self.get_health_insights(user_data, **kwargs)
+        if insights.get("success"):
+            return True, insights.get("result", {})
+        return False, {}
+    
     async def calculate_calorie_needs(self, **kwargs) -> Dict[str, Any]:
         """Calculate calorie needs using MCP"""
         if not self.mcp_client:
@@ -2,16 +2,357 @@
 Diet Planner Agent - Creates personalized diet plans based on user profile and requirements
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import logging
+import sys
 from datetime import datetime, timedelta
 import json
 import math
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from types import MappingProxyType
+
+import numpy as np
+
+try:
+    from numba import njit as _njit
+except ImportError:  # numba is optional; kernels run as plain Python without it
+    def _njit(*args, **kwargs):
+        return lambda func: func
 
 from app.agents.base_agent import BaseAgent
 
 logger = logging.getLogger(__name__)
 
+# Units shared by every generated food record
+_UNIT_G = sys.intern("g")
+_UNIT_PIECES = sys.intern("pieces")
+_UNIT_MEDIUM = sys.intern("medium")
+
+# Defaults for meal fields coming from the plan, keyed by plan field name
+MEAL_DEFAULTS = {
+    "type": "Breakfast",
+    "timing": "08:00",
+    "name": "Healthy Meal",
+    "calories": 0,
+    "protein": 0,
+    "carbs": 0,
+    "fat": 0,
+    "fiber": 0,
+    "instructions": "",
+    "difficulty": "beginner",
+    "prep_time": 10,
+    "cooking_time": 15,
+    "cost_category": "budget"
+}
+
+# Plan field name -> meals table column
+MEAL_COLUMNS = {
+    "type": "meal_type",
+    "timing": "meal_time",
+    "name": "meal_name",
+    "calories": "calories",
+    "protein": "protein",
+    "carbs": "carbs",
+    "fat": "fat",
+    "fiber": "fiber",
+    "instructions": "instructions",
+    "difficulty": "difficulty_level",
+    "prep_time": "prep_time_minutes",
+    "cooking_time": "cooking_time_minutes",
+    "cost_category": "cost_category"
+}
+
+# Defaults for ingredient fields, ordered to match the food_items columns after meal_id
+# (the keys are also the FoodItem field names)
+FOOD_DEFAULTS = {
+    "item": "Food item",
+    "quantity": 100,
+    "unit": _UNIT_G,
+    "calories": 0,
+    "protein": 0,
+    "carbs": 0,
+    "fat": 0,
+    "fiber": 0
+}
+_food_row_values = itemgetter(*FOOD_DEFAULTS)
+_food_item_values = attrgetter(*FOOD_DEFAULTS)
+
+@dataclass(frozen=True, slots=True)
+class FoodItem:
+    """A food portion within a generated meal"""
+    item: str
+    quantity: float
+    unit: str
+    calories: int
+    protein: float
+    carbs: float
+    fat: float
+    fiber: float
+
+# Food database with nutritional information per 100g, by meal type.
+# Optional "unit_policy" is (unit, grams per unit) for foods served by count;
+# a None weight means a single item of that size.
+_FOOD_DATABASE = MappingProxyType({
+    "Breakfast": {
+        "rolled oats": {"calories": 380, "protein": 13.0, "carbs": 68.0, "fat": 6.0, "fiber": 10.0},
+        "protein powder": {"calories": 400, "protein": 80.0, "carbs": 10.0, "fat": 3.0, "fiber": 0.0},
+        "almonds": {"calories": 579, "protein": 21.0, "carbs": 22.0, "fat": 50.0, "fiber": 12.0},
+        "berries": {"calories": 50, "protein": 1.0, "carbs": 12.0, "fat": 0.0, "fiber": 5.0},
+        "milk": {"calories": 50, "protein": 3.3, "carbs": 5.0, "fat": 2.0, "fiber": 0.0},
+        "eggs": {"calories": 155, "protein": 13.0, "carbs": 1.1, "fat": 11.0, "fiber": 0.0, "unit_policy": (_UNIT_PIECES, 50.0)},
+        "bread": {"calories": 265, "protein": 9.0, "carbs": 49.0, "fat": 3.0, "fiber": 4.0},
+        "greek yogurt": {"calories": 60, "protein": 10.0, "carbs": 4.0, "fat": 0.0, "fiber": 0.0},
+        "banana": {"calories": 89, "protein": 1.1, "carbs": 23.0, "fat": 0.3, "fiber": 2.6, "unit_policy": (_UNIT_MEDIUM, None)}
+    },
+    "Lunch": {
+        "chicken breast": {"calories": 110, "protein": 20.0, "carbs": 0.0, "fat": 2.4, "fiber": 0.0},
+        "mixed greens": {"calories": 25, "protein": 2.0, "carbs": 4.0, "fat": 0.0, "fiber": 2.0},
+        "olive oil": {"calories": 900, "protein": 0.0, "carbs": 0.0, "fat": 100.0, "fiber": 0.0},
+        "tomatoes": {"calories": 18, "protein": 0.9, "carbs": 4.0, "fat": 0.0, "fiber": 1.2},
+        "cucumber": {"calories": 16, "protein": 0.7, "carbs": 3.6, "fat": 0.1, "fiber": 0.5},
+        "quinoa": {"calories": 120, "protein": 4.0, "carbs": 22.0, "fat": 2.0, "fiber": 2.0},
+        "lentils": {"calories": 116, "protein": 9.0, "carbs": 20.0, "fat": 0.4, "fiber": 8.0},
+        "turkey": {"calories": 135, "protein": 25.0, "carbs": 0.0, "fat": 3.0, "fiber": 0.0}
+    },
+    "Dinner": {
+        "salmon": {"calories": 200, "protein": 20.0, "carbs": 0.0, "fat": 12.0, "fiber": 0.0},
+        "broccoli": {"calories": 25, "protein": 2.8, "carbs": 7.0, "fat": 0.4, "fiber": 2.6},
+        "carrots": {"calories": 41, "protein": 0.9, "carbs": 10.0, "fat": 0.0, "fiber": 2.8},
+        "tofu": {"calories": 76, "protein": 8.0, "carbs": 1.9, "fat": 4.8, "fiber": 0.3},
+        "beef steak": {"calories": 250, "protein": 26.0, "carbs": 0.0, "fat": 15.0, "fiber": 0.0},
+        "chickpeas": {"calories": 164, "protein": 9.0, "carbs": 27.0, "fat": 2.6, "fiber": 8.0},
+        "brown rice": {"calories": 111, "protein": 2.6, "carbs": 23.0, "fat": 0.9, "fiber": 1.8}
+    },
+    "Snack": {
+        "apple": {"calories": 52, "protein": 0.3, "carbs": 14.0, "fat": 0.2, "fiber": 2.4, "unit_policy": (_UNIT_MEDIUM, None)},
+        "peanut butter": {"calories": 588, "protein": 25.0, "carbs": 20.0, "fat": 50.0, "fiber": 6.0},
+        "nuts": {"calories": 607, "protein": 20.0, "carbs": 23.0, "fat": 54.0, "fiber": 7.0},
+        "hummus": {"calories": 166, "protein": 8.0, "carbs": 14.0, "fat": 10.0, "fiber": 6.0}
+    }
+})
+
+# Meals use the first few foods listed for their type (2-4 for variety), so
+# keep just those as parallel columns: names, unit policies and a per-100g
+# nutrient matrix with one row per food. Foods without calories are skipped
+# since portions are sized from calorie shares.
+_MAX_FOODS_PER_MEAL = 4
+_NUTRIENT_KEYS = ("calories", "protein", "carbs", "fat", "fiber")
+_SELECTED_FOODS = {
+    meal_type: tuple((name, info) for name, info in foods.items() if info["calories"] > 0)[:_MAX_FOODS_PER_MEAL]
+    for meal_type, foods in _FOOD_DATABASE.items()
+}
+_FOOD_NAMES = {meal_type: tuple(sys.intern(name) for name, _ in foods) for meal_type, foods in _SELECTED_FOODS.items()}
+_UNIT_POLICIES = {meal_type: tuple(info.get("unit_policy") for _, info in foods) for meal_type, foods in _SELECTED_FOODS.items()}
+_NUTRIENT_ARRAYS = {
+    meal_type: np.array([[info[key] for key in _NUTRIENT_KEYS] for _, info in foods], dtype=np.float64)
+    for meal_type, foods in _SELECTED_FOODS.items()
+}
+_PER_GRAM_NUTRIENTS = {meal_type: nutrients / 100.0 for meal_type, nutrients in _NUTRIENT_ARRAYS.items()}
+
+# Fixed breakfast ingredients per food preference
+_VEGETARIAN_BREAKFAST_INGREDIENTS = (
+    {"item": "rolled oats", "quantity": 60.0, "unit": "g", "calories": 228, "protein": 8.0, "carbs": 40.0, "fat": 4.0, "fiber": 6.0},
+    {"item": "protein powder", "quantity": 30.0, "unit": "g", "calories": 120, "protein": 24.0, "carbs": 3.0, "fat": 1.0, "fiber": 0.0},
+    {"item": "almonds", "quantity": 15.0, "unit": "g", "calories": 87, "protein": 3.0, "carbs": 3.0, "fat": 8.0, "fiber": 2.0},
+    {"item": "berries", "quantity": 50.0, "unit": "g", "calories": 25, "protein": 0.5, "carbs": 6.0, "fat": 0.0, "fiber": 2.5},
+    {"item": "milk", "quantity": 240.0, "unit": "ml", "calories": 120, "protein": 8.0, "carbs": 12.0, "fat": 5.0, "fiber": 0.0}
+)
+
+_VEGAN_BREAKFAST_INGREDIENTS = (
+    {"item": "quinoa", "quantity": 80.0, "unit": "g", "calories": 120, "protein": 4.0, "carbs": 22.0, "fat": 2.0, "fiber": 2.0},
+    {"item": "plant protein powder", "quantity": 30.0, "unit": "g", "calories": 120, "protein": 24.0, "carbs": 3.0, "fat": 1.0, "fiber": 0.0},
+    {"item": "chia seeds", "quantity": 20.0, "unit": "g", "calories": 97, "protein": 3.4, "carbs": 8.6, "fat": 8.6, "fiber": 6.8},
+    {"item": "banana", "quantity": 1.0, "unit": "medium", "calories": 105, "protein": 1.3, "carbs": 27.0, "fat": 0.4, "fiber": 3.1},
+    {"item": "almond milk", "quantity": 240.0, "unit": "ml", "calories": 60, "protein": 2.0, "carbs": 8.0, "fat": 2.5, "fiber": 0.0}
+)
+
+_NON_VEGETARIAN_BREAKFAST_INGREDIENTS = (
+    {"item": "eggs", "quantity": 2.0, "unit": "pieces", "calories": 140, "protein": 12.0, "carbs": 0.0, "fat": 10.0, "fiber": 0.0},
+    {"item": "whole grain bread", "quantity": 60.0, "unit": "g", "calories": 160, "protein": 6.0, "carbs": 30.0, "fat": 2.0, "fiber": 4.0},
+    {"item": "avocado", "quantity": 50.0, "unit": "g", "calories": 80, "protein": 1.0, "carbs": 4.0, "fat": 7.0, "fiber": 3.0},
+    {"item": "spinach", "quantity": 30.0, "unit": "g", "calories": 7, "protein": 0.9, "carbs": 1.1, "fat": 0.1, "fiber": 0.7},
+    {"item": "olive oil", "quantity": 5.0, "unit": "ml", "calories": 45, "protein": 0.0, "carbs": 0.0, "fat": 5.0, "fiber": 0.0}
+)
+
+_EGGETARIAN_BREAKFAST_INGREDIENTS = (
+    {"item": "eggs", "quantity": 2.0, "unit": "pieces", "calories": 140, "protein": 12.0, "carbs": 0.0, "fat": 10.0, "fiber": 0.0},
+    {"item": "rolled oats", "quantity": 60.0, "unit": "g", "calories": 228, "protein": 8.0, "carbs": 40.0, "fat": 4.0, "fiber": 6.0},
+    {"item": "milk", "quantity": 240.0, "unit": "ml", "calories": 120, "protein": 8.0, "carbs": 12.0, "fat": 5.0, "fiber": 0.0},
+    {"item": "honey", "quantity": 10.0, "unit": "g", "calories": 30, "protein": 0.0, "carbs": 8.0, "fat": 0.0, "fiber": 0.0},
+    {"item": "nuts", "quantity": 20.0, "unit": "g", "calories": 120, "protein": 4.0, "carbs": 4.0, "fat": 10.0, "fiber": 2.0}
+)
+
+_BREAKFAST_INGREDIENTS = {
+    "vegetarian": _VEGETARIAN_BREAKFAST_INGREDIENTS,
+    "vegan": _VEGAN_BREAKFAST_INGREDIENTS,
+    "non_vegetarian": _NON_VEGETARIAN_BREAKFAST_INGREDIENTS,
+    "eggetarian": _EGGETARIAN_BREAKFAST_INGREDIENTS
+}
+
+# Personalized breakfast names by (goal, food preference)
+_BREAKFAST_NAMES = {
+    ("weight_loss", "vegetarian"): "High-Protein Vegetarian Breakfast Bowl",
+    ("weight_loss", "vegan"): "Protein-Rich Vegan Smoothie Bowl",
+    ("weight_loss", "non_vegetarian"): "Lean Protein Breakfast Plate",
+    ("weight_loss", "default"): "Weight Loss Breakfast Bowl",
+    ("muscle_gain", "vegetarian"): "Muscle Building Vegetarian Breakfast",
+    ("muscle_gain", "vegan"): "Plant-Based Protein Power Bowl",
+    ("muscle_gain", "non_vegetarian"): "High-Protein Breakfast Platter",
+    ("muscle_gain", "default"): "Muscle Building Breakfast",
+    ("default", "vegetarian"): "Balanced Vegetarian Breakfast Bowl",
+    ("default", "vegan"): "Nutritious Vegan Breakfast",
+    ("default", "non_vegetarian"): "Balanced Breakfast Plate",
+    ("default", "default"): "Healthy Breakfast Bowl"
+}
+
+# who_cooks values for meals prepared at home without a hired cook
+_HOME_COOKS = frozenset({"self", "family_member"})
+
+# Breakfast instructions when someone else cooks, by who_cooks
+_DELEGATED_BREAKFAST_INSTRUCTIONS = {
+    "cook_helper": "Ask your cook to prepare this nutritious breakfast according to the recipe",
+    "family_member": "Ask a family member to help prepare this healthy breakfast"
+}
+
+# Breakfast instructions for cooking yourself, by food preference
+_BREAKFAST_INSTRUCTIONS = {
+    "vegetarian": "Cook oats with milk for 10 minutes, stir in protein powder, top with almonds and berries",
+    "vegan": "Cook quinoa with almond milk, stir in plant protein powder, add chia seeds and top with banana",
+    "non_vegetarian": "Scramble eggs with spinach, toast bread, and serve with sliced avocado and olive oil",
+    "eggetarian": "Boil eggs, cook oats with milk, and serve with honey and nuts"
+}
+
+# Static meal variations rotated through the fallback 7-day plan
+_BREAKFAST_OPTIONS = (
+    {"name": "Protein Oatmeal Bowl", "base_calories": 0.25, "fiber": 8.0, "difficulty": "beginner", "cost": "budget"},
+    {"name": "Greek Yogurt Parfait", "base_calories": 0.25, "fiber": 6.0, "difficulty": "beginner", "cost": "moderate"},
+    {"name": "Egg and Toast", "base_calories": 0.25, "fiber": 4.0, "difficulty": "beginner", "cost": "budget"},
+    {"name": "Smoothie Bowl", "base_calories": 0.25, "fiber": 7.0, "difficulty": "beginner", "cost": "moderate"}
+)
+
+_LUNCH_OPTIONS = (
+    {"name": "Grilled Chicken Salad", "base_calories": 0.35, "fiber": 12.0, "difficulty": "beginner", "cost": "moderate"},
+    {"name": "Quinoa Buddha Bowl", "base_calories": 0.35, "fiber": 15.0, "difficulty": "intermediate", "cost": "budget"},
+    {"name": "Turkey Wrap", "base_calories": 0.35, "fiber": 8.0, "difficulty": "beginner", "cost": "budget"},
+    {"name": "Lentil Soup", "base_calories": 0.35, "fiber": 18.0, "difficulty": "beginner", "cost": "budget"}
+)
+
+_DINNER_OPTIONS = (
+    {"name": "Salmon with Vegetables", "base_calories": 0.30, "fiber": 8.0, "difficulty": "intermediate", "cost": "premium"},
+    {"name": "Stir-Fried Tofu", "base_calories": 0.30, "fiber": 10.0, "difficulty": "beginner", "cost": "budget"},
+    {"name": "Lean Beef Steak", "base_calories": 0.30, "fiber": 6.0, "difficulty": "intermediate", "cost": "premium"},
+    {"name": "Chickpea Curry", "base_calories": 0.30, "fiber": 12.0, "difficulty": "beginner", "cost": "budget"}
+)
+
+_MORNING_SNACK = {
+    "name": "Greek Yogurt with Nuts", "base_calories": 0.15, "fiber": 3.0, "difficulty": "beginner", "cost": "moderate",
+    "instructions": "Mix Greek yogurt with a handful of mixed nuts for a protein-rich snack",
+    "prep_time": 2, "cooking_time": 0
+}
+
+_AFTERNOON_SNACK = {
+    "name": "Apple with Peanut Butter", "base_calories": 0.10, "fiber": 4.0, "difficulty": "beginner", "cost": "budget",
+    "instructions": "Slice apple and serve with natural peanut butter for a healthy afternoon snack",
+    "prep_time": 3, "cooking_time": 0
+}
+
+# Meal slots of each fallback day and their share of the daily targets
+_MEAL_SLOT_TYPES = ("Breakfast", "Snack", "Lunch", "Snack", "Dinner")
+_MEAL_SLOT_RATIOS = (
+    _BREAKFAST_OPTIONS[0]["base_calories"],
+    _MORNING_SNACK["base_calories"],
+    _LUNCH_OPTIONS[0]["base_calories"],
+    _AFTERNOON_SNACK["base_calories"],
+    _DINNER_OPTIONS[0]["base_calories"]
+)
+
+_DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+@_njit(cache=True)
+def _allocate_quantities(meal_calories, per_gram):
+    """
+    Allocate gram quantities across a meal's foods and compute their nutrients.
+    
+    Every food but the last gets a growing share of the meal calories (30%,
+    50%, 70%, ...); the last one fills whatever calories remain. Quantities
+    are kept within 10g-200g. per_gram holds nutrients per gram, one row per
+    food in _NUTRIENT_KEYS order, and every food must have calories. Returns
+    (quantities, actuals) with actuals in the same layout.
+    """
+    last = per_gram.shape[0] - 1
+    quantities = np.empty(last + 1)
+    remaining_calories = meal_calories
+    
+    for i in range(last):
+        quantity = meal_calories * (0.3 + i * 0.2) / per_gram[i, 0]
+        quantity = max(10.0, min(200.0, quantity))
+        quantities[i] = quantity
+        remaining_calories -= quantity * per_gram[i, 0]
+    
+    # Only the last food consumes the remaining calories
+    quantity = remaining_calories / per_gram[last, 0]
+    quantities[last] = max(10.0, min(200.0, quantity))
+    
+    actuals = np.empty(per_gram.shape)
+    for i in range(last + 1):
+        for j in range(per_gram.shape[1]):
+            actuals[i, j] = quantities[i] * per_gram[i, j]
+    
+    return quantities, actuals
+
+@lru_cache(maxsize=512)
+def _build_meal_food_items(meal_type: str, meal_calories: float) -> Tuple[FoodItem, ...]:
+    """
+    Build the food items for a meal type and calorie target.
+    
+    Only the meal type and calories drive the quantities, so results are
+    cached on those and returned as an immutable tuple of FoodItem records
+    shared across calls; callers that need dicts or a list copy it themselves.
+    """
+    # Nothing to portion for an empty or negative calorie target
+    if meal_calories <= 0:
+        return ()
+    
+    # Get available foods for this meal type
+    if meal_type not in _FOOD_DATABASE:
+        meal_type = "Breakfast"
+    food_names = _FOOD_NAMES[meal_type]
+    per_gram = _PER_GRAM_NUTRIENTS[meal_type]
+    num_items = len(food_names)
+    quantities, actuals = _allocate_quantities(float(meal_calories), per_gram)
+    
+    # Round calories to whole numbers and the other nutrients to one decimal
+    rounded = np.empty_like(actuals)
+    rounded[:, 0] = np.round(actuals[:, 0])
+    rounded[:, 1:] = np.round(actuals[:, 1:], 1)
+    
+    food_items = []
+    for food_name, unit_policy, quantity, (actual_calories, actual_protein, actual_carbs, actual_fat, actual_fiber) in zip(
+        food_names, _UNIT_POLICIES[meal_type], quantities.tolist(), rounded.tolist()
+    ):
+        # Determine appropriate unit; small portions (under 50g) of countable
+        # foods are expressed per piece (grams per piece) or as a single item
+        unit = _UNIT_G
+        if unit_policy is not None and quantity < 50:
+            unit, grams_per_unit = unit_policy
+            quantity = int(quantity / grams_per_unit) if grams_per_unit else 1
+        
+        food_items.append(FoodItem(
+            item=food_name,
+            quantity=round(quantity, 1),
+            unit=unit,
+            calories=int(actual_calories),
+            protein=actual_protein,
+            carbs=actual_carbs,
+            fat=actual_fat,
+            fiber=actual_fiber
+        ))
+    
+    return tuple(food_items)
+
+
 class DietPlannerAgent(BaseAgent):
     """
     Agent responsible for creating personalized diet plans based on user profile data
@@ -99,7 +440,7 @@ class DietPlannerAgent(BaseAgent):
             # In a real implementation, you'd call the profile API endpoint
             return None  # Placeholder - will be implemented with actual API call
         except Exception as e:
-            logger.error(f"Failed to get user profile: {str(e)}")
+            logger.error("Failed to get user profile: %s", e)
             return None
     
     def _calculate_health_metrics(self, profile_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -159,7 +500,7 @@ class DietPlannerAgent(BaseAgent):
             }
             
         except Exception as e:
-            logger.error(f"Failed to calculate health metrics: {str(e)}")
+            logger.error("Failed to calculate health metrics: %s", e)
             return {}
     
     def _get_bmi_category(self, bmi: float) -> str:
@@ -252,7 +593,7 @@ class DietPlannerAgent(BaseAgent):
                 )
                 diet_plan = self._parse_ai_response(ai_response)
             except Exception as e:
-                logger.warning(f"OpenAI call failed, using enhanced mock response: {str(e)}")
+                logger.warning("OpenAI call failed, using enhanced mock response: %s", e)
                 diet_plan = self._create_enhanced_mock_diet_plan(profile_data, health_metrics)
             
             # Validate and enhance diet plan
@@ -261,7 +602,7 @@ class DietPlannerAgent(BaseAgent):
             return enhanced_plan
             
         except Exception as e:
-            logger.error(f"Failed to create comprehensive diet plan: {str(e)}")
+            logger.error("Failed to create comprehensive diet plan: %s", e)
             raise
     
     def _build_comprehensive_diet_plan_prompt(self, profile_data: Dict[str, Any], health_metrics: Dict[str, Any]) -> str:
@@ -717,7 +1058,7 @@ class DietPlannerAgent(BaseAgent):
                     "fiber": 8.5,
                     "ingredients": self._get_personalized_breakfast_ingredients(food_preference, breakfast_calories),
                     "instructions": self._get_personalized_breakfast_instructions(food_preference, who_cooks),
-                    "difficulty": "beginner" if who_cooks in ["self", "family_member"] else "beginner",
+                    "difficulty": "beginner" if who_cooks in _HOME_COOKS else "beginner",
                     "prep_time": 5,
                     "cooking_time": 10,
                     "cost_category": "budget" if profile_data.get("budget_flexibility") == "limited" else "moderate"
@@ -851,8 +1192,8 @@ class DietPlannerAgent(BaseAgent):
             
         except json.JSONDecodeError as e:
             # If JSON parsing fails, create a structured response
-            logger.warning(f"Failed to parse AI response as JSON: {str(e)}")
-            logger.warning(f"AI Response preview: {ai_response[:200]}...")
+            logger.warning("Failed to parse AI response as JSON: %s", e)
+            logger.warning("AI Response preview: %s...", ai_response[:200])
             
             # Try to extract any useful information from the text response
             extracted_info = self._extract_info_from_text_response(ai_response)
@@ -1017,7 +1358,8 @@ class DietPlannerAgent(BaseAgent):
             
             daily_meals.append(daily_plan)
         
-        logger.info(f"Created basic daily meals: {len(daily_meals)} days with {sum(len(day.get('meals', [])) for day in daily_meals)} total meals")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Created basic daily meals: %d days with %d total meals", len(daily_meals), sum(len(day.get('meals', ())) for day in daily_meals))
         return daily_meals
     
     def _create_minimal_fallback_plan(self, profile_data: Dict[str, Any], health_metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -1102,7 +1444,7 @@ class DietPlannerAgent(BaseAgent):
             
             daily_plans.append(daily_plan)
         
-        logger.info(f"Created minimal fallback plan with {len(daily_plans)} days")
+        logger.info("Created minimal fallback plan with %s days", len(daily_plans))
         return daily_plans
     
     async def _enhance_comprehensive_diet_plan(self, diet_plan: Dict[str, Any], profile_data: Dict[str, Any], health_metrics: Dict[str, Any]) -> Dict[str, Any]:
@@ -1135,7 +1477,7 @@ class DietPlannerAgent(BaseAgent):
             return enhanced_plan
             
         except Exception as e:
-            logger.error(f"Failed to enhance comprehensive diet plan: {str(e)}")
+            logger.error("Failed to enhance comprehensive diet plan: %s", e)
             return diet_plan
     
     def _generate_comprehensive_compliance_tips(self, profile_data: Dict[str, Any], health_metrics: Dict[str, Any]) -> List[str]:
@@ -1203,7 +1545,7 @@ class DietPlannerAgent(BaseAgent):
             supabase_manager = SupabaseManager()
             
             # Clean up existing diet plans before creating new ones
-            logger.info(f"🧹 Cleaning up existing diet plans for user: {user_id}")
+            logger.info("🧹 Cleaning up existing diet plans for user: %s", user_id)
             
             # Use the nuclear option to ensure ALL data is completely cleared
             logger.info("💥 Force clearing ALL existing diet data to ensure completely clean slate...")
@@ -1216,11 +1558,11 @@ class DietPlannerAgent(BaseAgent):
                 deleted_food_items = force_clear_result.get("deleted_food_items", 0)
                 
                 if deleted_plans > 0:
-                    logger.info(f"✅ Force cleared {deleted_plans} diet plans, {deleted_daily_plans} daily plans, {deleted_meals} meals, {deleted_food_items} food items")
+                    logger.info("✅ Force cleared %s diet plans, %s daily plans, %s meals, %s food items", deleted_plans, deleted_daily_plans, deleted_meals, deleted_food_items)
                 else:
                     logger.info("✅ No existing diet data to clear")
             else:
-                logger.warning(f"⚠️ Failed to force clear existing diet data: {force_clear_result.get('error')}")
+                logger.warning("⚠️ Failed to force clear existing diet data: %s", force_clear_result.get('error'))
                 # Try regular deletion as fallback
                 logger.info("🔄 Attempting regular deletion as fallback...")
                 delete_result = await supabase_manager.delete_all_user_diet_plans(user_id)
@@ -1228,11 +1570,11 @@ class DietPlannerAgent(BaseAgent):
                 if delete_result["success"]:
                     deleted_count = delete_result.get("deleted_count", 0)
                     if deleted_count > 0:
-                        logger.info(f"✅ Deleted {deleted_count} existing diet plans as fallback")
+                        logger.info("✅ Deleted %s existing diet plans as fallback", deleted_count)
                     else:
                         logger.info("✅ No existing diet plans to delete")
                 else:
-                    logger.warning(f"⚠️ Failed to delete existing diet plans: {delete_result.get('error')}")
+                    logger.warning("⚠️ Failed to delete existing diet plans: %s", delete_result.get('error'))
                     # Continue with plan creation even if cleanup fails
             
             # Calculate plan dates (7 days from today)
@@ -1253,16 +1595,17 @@ class DietPlannerAgent(BaseAgent):
             
             plan_result = await supabase_manager.create_diet_plan(user_id, plan_data)
             if not plan_result["success"]:
-                logger.error(f"Failed to create diet plan: {plan_result.get('error')}")
+                logger.error("Failed to create diet plan: %s", plan_result.get('error'))
                 return {"success": False, "error": "Failed to save diet plan"}
             
             plan_id = plan_result["plan_id"]
-            logger.info(f"✅ Diet plan created with ID: {plan_id}")
+            logger.info("✅ Diet plan created with ID: %s", plan_id)
             
             # 2. Create daily plans and meals
             daily_meals = diet_plan.get("daily_meals", [])
-            logger.info(f"🔍 Initial daily_meals from diet_plan: {len(daily_meals)} items")
-            logger.info(f"🔍 diet_plan keys: {list(diet_plan.keys())}")
+            logger.info("🔍 Initial daily_meals from diet_plan: %d items", len(daily_meals))
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("🔍 diet_plan keys: %s", list(diet_plan.keys()))
             
             if not daily_meals:
                 logger.info("🚨 No daily meals in LLM response, creating comprehensive 7-day plan")
@@ -1270,49 +1613,62 @@ class DietPlannerAgent(BaseAgent):
                 try:
                     logger.info("🔄 Calling _create_comprehensive_7_day_plan...")
                     daily_meals = self._create_comprehensive_7_day_plan(profile_data, health_metrics)
-                    logger.info(f"✅ Created {len(daily_meals)} daily plans with {sum(len(day.get('meals', [])) for day in daily_meals)} total meals")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info("✅ Created %d daily plans with %d total meals", len(daily_meals), sum(len(day.get('meals', ())) for day in daily_meals))
                     
                     # Debug: Check the structure of the first day if it exists
                     if daily_meals and len(daily_meals) > 0:
                         first_day = daily_meals[0]
-                        logger.info(f"🔍 First day structure: {list(first_day.keys())}")
+                        if logger.isEnabledFor(logging.INFO):
+                            logger.info("🔍 First day structure: %s", list(first_day.keys()))
                         if 'meals' in first_day:
-                            logger.info(f"🔍 First day meals: {len(first_day['meals'])} meals")
+                            logger.info("🔍 First day meals: %d meals", len(first_day['meals']))
                         else:
                             logger.warning("⚠️ First day missing 'meals' key")
                     else:
                         logger.warning("⚠️ daily_meals is empty after _create_comprehensive_7_day_plan")
                         
                 except Exception as e:
-                    logger.error(f"❌ Error creating comprehensive 30-day plan: {str(e)}")
-                    logger.error(f"❌ Exception type: {type(e).__name__}")
+                    logger.error("❌ Error creating comprehensive 30-day plan: %s", e)
+                    logger.error("❌ Exception type: %s", type(e).__name__)
                     import traceback
-                    logger.error(f"❌ Traceback: {traceback.format_exc()}")
+                    logger.error("❌ Traceback: %s", traceback.format_exc())
                     # Create a minimal fallback
                     logger.info("🔄 Creating minimal fallback plan...")
                     daily_meals = self._create_minimal_fallback_plan(profile_data, health_metrics)
-                    logger.info(f"✅ Created minimal fallback plan with {len(daily_meals)} days")
+                    logger.info("✅ Created minimal fallback plan with %s days", len(daily_meals))
             else:
-                logger.info(f"✅ Using LLM-generated daily meals: {len(daily_meals)} days")
+                logger.info("✅ Using LLM-generated daily meals: %s days", len(daily_meals))
+            
+            # Plan-wide daily targets, used for days the LLM did not total itself
+            macros = health_metrics.get("macronutrients", {})
+            daily_defaults = {
+                "total_calories": health_metrics.get("target_calories", 2000),
+                "total_protein": macros.get("protein_g", 150),
+                "total_carbs": macros.get("carb_g", 200),
+                "total_fat": macros.get("fat_g", 67),
+                "water_intake_target": 2.5  # Default 2.5L per day
+            }
+            
+            # Food items are the largest table written here, so collect them
+            # across all meals and write them in a single bulk insert
+            food_rows = []
             
             # Process each day
             for day_index, day_data in enumerate(daily_meals):
                 current_date = start_date + timedelta(days=day_index)
                 
-                # Create daily plan
-                daily_data = {
-                    "date": current_date.isoformat(),
-                    "total_calories": health_metrics.get("target_calories", 2000),
-                    "total_protein": health_metrics.get("macronutrients", {}).get("protein_g", 150),
-                    "total_carbs": health_metrics.get("macronutrients", {}).get("carb_g", 200),
-                    "total_fat": health_metrics.get("macronutrients", {}).get("fat_g", 67),
-                    "water_intake_target": 2.5,  # Default 2.5L per day
-                    "notes": day_data.get("notes", "")
-                }
+                # Create daily plan, keeping LLM-computed totals when present
+                if "total_calories" in day_data:
+                    daily_data = {key: day_data.get(key, value) for key, value in daily_defaults.items()}
+                else:
+                    daily_data = dict(daily_defaults)
+                daily_data["date"] = current_date.isoformat()
+                daily_data["notes"] = day_data.get("notes", "")
                 
                 daily_result = await supabase_manager.create_daily_plan(plan_id, daily_data)
                 if not daily_result["success"]:
-                    logger.error(f"Failed to create daily plan for {current_date}: {daily_result.get('error')}")
+                    logger.error("Failed to create daily plan for %s: %s", current_date, daily_result.get('error'))
                     continue
                 
                 daily_plan_id = daily_result["daily_plan_id"]
@@ -1325,58 +1681,30 @@ class DietPlannerAgent(BaseAgent):
                 
                 for meal_data in meals:
                     # Create meal
-                    meal_info = {
-                        "meal_type": meal_data.get("type", "Breakfast"),
-                        "meal_time": meal_data.get("timing", "08:00"),
-                        "meal_name": meal_data.get("name", "Healthy Meal"),
-                        "calories": meal_data.get("calories", 0),
-                        "protein": meal_data.get("protein", 0),
-                        "carbs": meal_data.get("carbs", 0),
-                        "fat": meal_data.get("fat", 0),
-                        "fiber": meal_data.get("fiber", 0),
-                        "instructions": meal_data.get("instructions", ""),
-                        "difficulty_level": meal_data.get("difficulty", "beginner"),
-                        "prep_time_minutes": meal_data.get("prep_time", 10),
-                        "cooking_time_minutes": meal_data.get("cooking_time", 15),
-                        "cost_category": meal_data.get("cost_category", "budget")
-                    }
+                    merged_meal = {**MEAL_DEFAULTS, **meal_data}
+                    meal_info = {column: merged_meal[key] for key, column in MEAL_COLUMNS.items()}
                     
                     meal_result = await supabase_manager.create_meal(daily_plan_id, meal_info)
                     if not meal_result["success"]:
-                        logger.error(f"Failed to create meal: {meal_result.get('error')}")
+                        logger.error("Failed to create meal: %s", meal_result.get('error'))
                         continue
                     
                     meal_id = meal_result["meal_id"]
                     
-                    # Create food items for this meal
-                    ingredients = meal_data.get("ingredients", [])
-                    if ingredients:
-                        for ingredient in ingredients:
-                            if isinstance(ingredient, dict):
-                                food_data = {
-                                    "food_name": ingredient.get("item", "Food item"),
-                                    "quantity": ingredient.get("quantity", 100),
-                                    "unit": ingredient.get("unit", "g"),
-                                    "calories": ingredient.get("calories", 0),
-                                    "protein": ingredient.get("protein", 0),
-                                    "carbs": ingredient.get("carbs", 0),
-                                    "fat": ingredient.get("fat", 0),
-                                    "fiber": ingredient.get("fiber", 0)
-                                }
-                            else:
-                                # Handle simple string ingredients
-                                food_data = {
-                                    "food_name": str(ingredient),
-                                    "quantity": 100,
-                                    "unit": "g",
-                                    "calories": 0,
-                                    "protein": 0,
-                                    "carbs": 0,
-                                    "fat": 0,
-                                    "fiber": 0
-                                }
-                            
-                            await supabase_manager.create_food_item(meal_id, food_data)
+                    # Collect food items for this meal
+                    for ingredient in meal_data.get("ingredients", []):
+                        if isinstance(ingredient, FoodItem):
+                            food_rows.append((meal_id, *_food_item_values(ingredient)))
+                        elif isinstance(ingredient, dict):
+                            food_rows.append((meal_id, *_food_row_values({**FOOD_DEFAULTS, **ingredient})))
+                        else:
+                            # Handle simple string ingredients
+                            food_rows.append((meal_id, *_food_row_values({**FOOD_DEFAULTS, "item": str(ingredient)})))
+            
+            # 3. Create all food items in one bulk write
+            food_result = await supabase_manager.bulk_create_food_items(food_rows)
+            if not food_result["success"]:
+                logger.warning("⚠️ Failed to create food items: %s", food_result.get('error'))
             
             # 4. Create initial progress tracking entry for the user
             progress_data = {
@@ -1390,11 +1718,11 @@ class DietPlannerAgent(BaseAgent):
             
             progress_result = await supabase_manager.create_progress_tracking(user_id, progress_data)
             if progress_result["success"]:
-                logger.info(f"✅ Progress tracking created for user: {user_id}")
+                logger.info("✅ Progress tracking created for user: %s", user_id)
             else:
-                logger.warning(f"⚠️ Failed to create progress tracking: {progress_result.get('error')}")
+                logger.warning("⚠️ Failed to create progress tracking: %s", progress_result.get('error'))
             
-            logger.info(f"✅ Diet plan saved to database successfully: {plan_id}")
+            logger.info("✅ Diet plan saved to database successfully: %s", plan_id)
             return {
                 "success": True,
                 "plan_id": plan_id,
@@ -1404,7 +1732,7 @@ class DietPlannerAgent(BaseAgent):
             }
             
         except Exception as e:
-            logger.error(f"❌ Failed to save diet plan to database: {str(e)}")
+            logger.error("❌ Failed to save diet plan to database: %s", e)
             return {
                 "success": False,
                 "error": f"Database save failed: {str(e)}"
@@ -1543,163 +1871,122 @@ class DietPlannerAgent(BaseAgent):
         daily_plans = []
         start_date = datetime.utcnow().date()
         
-        # Meal variations for variety
-        breakfast_options = [
-            {"name": "Protein Oatmeal Bowl", "base_calories": 0.25, "fiber": 8.0, "difficulty": "beginner", "cost": "budget"},
-            {"name": "Greek Yogurt Parfait", "base_calories": 0.25, "fiber": 6.0, "difficulty": "beginner", "cost": "moderate"},
-            {"name": "Egg and Toast", "base_calories": 0.25, "fiber": 4.0, "difficulty": "beginner", "cost": "budget"},
-            {"name": "Smoothie Bowl", "base_calories": 0.25, "fiber": 7.0, "difficulty": "beginner", "cost": "moderate"}
-        ]
-        
-        lunch_options = [
-            {"name": "Grilled Chicken Salad", "base_calories": 0.35, "fiber": 12.0, "difficulty": "beginner", "cost": "moderate"},
-            {"name": "Quinoa Buddha Bowl", "base_calories": 0.35, "fiber": 15.0, "difficulty": "intermediate", "cost": "budget"},
-            {"name": "Turkey Wrap", "base_calories": 0.35, "fiber": 8.0, "difficulty": "beginner", "cost": "budget"},
-            {"name": "Lentil Soup", "base_calories": 0.35, "fiber": 18.0, "difficulty": "beginner", "cost": "budget"}
-        ]
-        
-        dinner_options = [
-            {"name": "Salmon with Vegetables", "base_calories": 0.30, "fiber": 8.0, "difficulty": "intermediate", "cost": "premium"},
-            {"name": "Stir-Fried Tofu", "base_calories": 0.30, "fiber": 10.0, "difficulty": "beginner", "cost": "budget"},
-            {"name": "Lean Beef Steak", "base_calories": 0.30, "fiber": 6.0, "difficulty": "intermediate", "cost": "premium"},
-            {"name": "Chickpea Curry", "base_calories": 0.30, "fiber": 12.0, "difficulty": "beginner", "cost": "budget"}
+        # Macro splits per meal slot, computed once for the whole plan.
+        # Rows are (calories, protein, carbs, fat); columns follow the
+        # Breakfast, Snack, Lunch, Snack, Dinner order of each day.
+        target_calories = health_metrics.get("target_calories", 2000)
+        macros = health_metrics.get("macronutrients", {})
+        protein_g = macros.get("protein_g", 150)
+        carb_g = macros.get("carb_g", 200)
+        fat_g = macros.get("fat_g", 67)
+        macro_targets = np.array([target_calories, protein_g, carb_g, fat_g], dtype=np.float64)
+        splits = np.outer(macro_targets, _MEAL_SLOT_RATIOS).astype(np.int64).tolist()
+        calories_split, protein_split, carbs_split, fat_split = splits
+        
+        # Every day uses the same per-slot calorie targets, so build each
+        # slot's food items once for the whole week
+        slot_ingredients = [
+            _build_meal_food_items(meal_type, meal_calories)
+            for meal_type, meal_calories in zip(_MEAL_SLOT_TYPES, calories_split)
         ]
         
         # Generate 7 days of meal plans (Monday through Sunday)
-        day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        for day in range(7):
+        for day, day_name in enumerate(_DAY_NAMES):
             current_date = start_date + timedelta(days=day)
             
             # Select meal variations for variety
-            breakfast = breakfast_options[day % len(breakfast_options)]
-            lunch = lunch_options[day % len(lunch_options)]
-            dinner = dinner_options[day % len(dinner_options)]
-            
-            target_calories = health_metrics.get("target_calories", 2000)
+            breakfast = _BREAKFAST_OPTIONS[day % len(_BREAKFAST_OPTIONS)]
+            lunch = _LUNCH_OPTIONS[day % len(_LUNCH_OPTIONS)]
+            dinner = _DINNER_OPTIONS[day % len(_DINNER_OPTIONS)]
             
             daily_plan = {
                 "date": current_date.isoformat(),
                 "total_calories": target_calories,
-                "total_protein": health_metrics.get("macronutrients", {}).get("protein_g", 150),
-                "total_carbs": health_metrics.get("macronutrients", {}).get("carb_g", 200),
-                "total_fat": health_metrics.get("macronutrients", {}).get("fat_g", 67),
+                "total_protein": protein_g,
+                "total_carbs": carb_g,
+                "total_fat": fat_g,
                 "water_intake_target": 2.5 + (day % 3) * 0.2,  # Vary water intake slightly
-                "notes": f"{day_names[day]} - {day_names[day].lower()} meal plan with balanced nutrition",
+                "notes": f"{day_name} - {day_name.lower()} meal plan with balanced nutrition",
                 "meals": [
                     {
                         "type": "Breakfast",
                         "timing": "08:00",
                         "name": breakfast["name"],
-                        "calories": int(target_calories * breakfast["base_calories"]),
-                        "protein": int(health_metrics.get("macronutrients", {}).get("protein_g", 150) * breakfast["base_calories"]),
-                        "carbs": int(health_metrics.get("macronutrients", {}).get("carb_g", 200) * breakfast["base_calories"]),
-                        "fat": int(health_metrics.get("macronutrients", {}).get("fat_g", 67) * breakfast["base_calories"]),
+                        "calories": calories_split[0],
+                        "protein": protein_split[0],
+                        "carbs": carbs_split[0],
+                        "fat": fat_split[0],
                         "fiber": breakfast["fiber"],
                         "instructions": f"Prepare {breakfast['name'].lower()} following your meal plan guidelines",
                         "difficulty": breakfast["difficulty"],
                         "prep_time": 5 + (day % 3) * 2,
                         "cooking_time": 10 + (day % 3) * 3,
                         "cost_category": breakfast["cost"],
-                        "ingredients": self._create_realistic_food_items(
-                            "Breakfast",
-                            int(target_calories * breakfast["base_calories"]),
-                            int(health_metrics.get("macronutrients", {}).get("protein_g", 150) * breakfast["base_calories"]),
-                            int(health_metrics.get("macronutrients", {}).get("carb_g", 200) * breakfast["base_calories"]),
-                            int(health_metrics.get("macronutrients", {}).get("fat_g", 67) * breakfast["base_calories"]),
-                            breakfast["fiber"]
-                        )
+                        "ingredients": slot_ingredients[0]
                     },
                     {
                         "type": "Snack",
                         "timing": "10:30",
-                        "name": "Greek Yogurt with Nuts",
-                        "calories": int(target_calories * 0.15),
-                        "protein": int(health_metrics.get("macronutrients", {}).get("protein_g", 150) * 0.15),
-                        "carbs": int(health_metrics.get("macronutrients", {}).get("carb_g", 200) * 0.15),
-                        "fat": int(health_metrics.get("macronutrients", {}).get("fat_g", 67) * 0.15),
-                        "fiber": 3.0,
-                        "instructions": "Mix Greek yogurt with a handful of mixed nuts for a protein-rich snack",
-                        "difficulty": "beginner",
-                        "prep_time": 2,
-                        "cooking_time": 0,
-                        "cost_category": "moderate",
-                        "ingredients": self._create_realistic_food_items(
-                            "Snack",
-                            int(target_calories * 0.15),
-                            int(health_metrics.get("macronutrients", {}).get("protein_g", 150) * 0.15),
-                            int(health_metrics.get("macronutrients", {}).get("carb_g", 200) * 0.15),
-                            int(health_metrics.get("macronutrients", {}).get("fat_g", 67) * 0.15),
-                            3.0
-                        )
+                        "name": _MORNING_SNACK["name"],
+                        "calories": calories_split[1],
+                        "protein": protein_split[1],
+                        "carbs": carbs_split[1],
+                        "fat": fat_split[1],
+                        "fiber": _MORNING_SNACK["fiber"],
+                        "instructions": _MORNING_SNACK["instructions"],
+                        "difficulty": _MORNING_SNACK["difficulty"],
+                        "prep_time": _MORNING_SNACK["prep_time"],
+                        "cooking_time": _MORNING_SNACK["cooking_time"],
+                        "cost_category": _MORNING_SNACK["cost"],
+                        "ingredients": slot_ingredients[1]
                     },
                     {
                         "type": "Lunch",
                         "timing": "13:00",
                         "name": lunch["name"],
-                        "calories": int(target_calories * lunch["base_calories"]),
-                        "protein": int(health_metrics.get("macronutrients", {}).get("protein_g", 150) * lunch["base_calories"]),
-                        "carbs": int(health_metrics.get("macronutrients", {}).get("carb_g", 200) * lunch["base_calories"]),
-                        "fat": int(health_metrics.get("macronutrients", {}).get("fat_g", 67) * lunch["base_calories"]),
+                        "calories": calories_split[2],
+                        "protein": protein_split[2],
+                        "carbs": carbs_split[2],
+                        "fat": fat_split[2],
                         "fiber": lunch["fiber"],
                         "instructions": f"Prepare {lunch['name'].lower()} following your meal plan guidelines",
                         "difficulty": lunch["difficulty"],
                         "prep_time": 10 + (day % 3) * 2,
                         "cooking_time": 15 + (day % 3) * 3,
                         "cost_category": lunch["cost"],
-                        "ingredients": self._create_realistic_food_items(
-                            "Lunch",
-                            int(target_calories * lunch["base_calories"]),
-                            int(health_metrics.get("macronutrients", {}).get("protein_g", 150) * lunch["base_calories"]),
-                            int(health_metrics.get("macronutrients", {}).get("carb_g", 200) * lunch["base_calories"]),
-                            int(health_metrics.get("macronutrients", {}).get("fat_g", 67) * lunch["base_calories"]),
-                            lunch["fiber"]
-                        )
+                        "ingredients": slot_ingredients[2]
                     },
                     {
                         "type": "Snack",
                         "timing": "16:00",
-                        "name": "Apple with Peanut Butter",
-                        "calories": int(target_calories * 0.10),
-                        "protein": int(health_metrics.get("macronutrients", {}).get("protein_g", 150) * 0.10),
-                        "carbs": int(health_metrics.get("macronutrients", {}).get("carb_g", 200) * 0.10),
-                        "fat": int(health_metrics.get("macronutrients", {}).get("fat_g", 67) * 0.10),
-                        "fiber": 4.0,
-                        "instructions": "Slice apple and serve with natural peanut butter for a healthy afternoon snack",
-                        "difficulty": "beginner",
-                        "prep_time": 3,
-                        "cooking_time": 0,
-                        "cost_category": "budget",
-                        "ingredients": self._create_realistic_food_items(
-                            "Snack",
-                            int(target_calories * 0.10),
-                            int(health_metrics.get("macronutrients", {}).get("protein_g", 150) * 0.10),
-                            int(health_metrics.get("macronutrients", {}).get("carb_g", 200) * 0.10),
-                            int(health_metrics.get("macronutrients", {}).get("fat_g", 67) * 0.10),
-                            4.0
-                        )
+                        "name": _AFTERNOON_SNACK["name"],
+                        "calories": calories_split[3],
+                        "protein": protein_split[3],
+                        "carbs": carbs_split[3],
+                        "fat": fat_split[3],
+                        "fiber": _AFTERNOON_SNACK["fiber"],
+                        "instructions": _AFTERNOON_SNACK["instructions"],
+                        "difficulty": _AFTERNOON_SNACK["difficulty"],
+                        "prep_time": _AFTERNOON_SNACK["prep_time"],
+                        "cooking_time": _AFTERNOON_SNACK["cooking_time"],
+                        "cost_category": _AFTERNOON_SNACK["cost"],
+                        "ingredients": slot_ingredients[3]
                     },
                     {
                         "type": "Dinner",
                         "timing": "19:00",
                         "name": dinner["name"],
-                        "calories": int(target_calories * dinner["base_calories"]),
-                        "protein": int(health_metrics.get("macronutrients", {}).get("protein_g", 150) * dinner["base_calories"]),
-                        "carbs": int(health_metrics.get("macronutrients", {}).get("carb_g", 200) * dinner["base_calories"]),
-                        "fat": int(health_metrics.get("macronutrients", {}).get("fat_g", 67) * dinner["base_calories"]),
+                        "calories": calories_split[4],
+                        "protein": protein_split[4],
+                        "carbs": carbs_split[4],
+                        "fat": fat_split[4],
                         "fiber": dinner["fiber"],
                         "instructions": f"Prepare {dinner['name'].lower()} following your meal plan guidelines",
                         "difficulty": dinner["difficulty"],
                         "prep_time": 10 + (day % 3) * 2,
                         "cooking_time": 20 + (day % 3) * 3,
                         "cost_category": dinner["cost"],
-                        "ingredients": self._create_realistic_food_items(
-                            "Dinner",
-                            int(target_calories * dinner["base_calories"]),
-                            int(health_metrics.get("macronutrients", {}).get("protein_g", 150) * dinner["base_calories"]),
-                            int(health_metrics.get("macronutrients", {}).get("carb_g", 200) * dinner["base_calories"]),
-                            int(health_metrics.get("macronutrients", {}).get("fat_g", 67) * dinner["base_calories"]),
-                            dinner["fiber"]
-                        )
+                        "ingredients": slot_ingredients[4]
                     }
                 ]
             }
@@ -1710,198 +1997,25 @@ class DietPlannerAgent(BaseAgent):
     
     def _create_realistic_food_items(self, meal_type: str, meal_calories: int, meal_protein: float, meal_carbs: float, meal_fat: float, meal_fiber: float) -> List[Dict[str, Any]]:
         """Create realistic food items for a meal with proper nutritional breakdown"""
-        
-        # Food database with nutritional information per 100g
-        food_database = {
-            "Breakfast": {
-                "rolled oats": {"calories": 380, "protein": 13.0, "carbs": 68.0, "fat": 6.0, "fiber": 10.0},
-                "protein powder": {"calories": 400, "protein": 80.0, "carbs": 10.0, "fat": 3.0, "fiber": 0.0},
-                "almonds": {"calories": 579, "protein": 21.0, "carbs": 22.0, "fat": 50.0, "fiber": 12.0},
-                "berries": {"calories": 50, "protein": 1.0, "carbs": 12.0, "fat": 0.0, "fiber": 5.0},
-                "milk": {"calories": 50, "protein": 3.3, "carbs": 5.0, "fat": 2.0, "fiber": 0.0},
-                "eggs": {"calories": 155, "protein": 13.0, "carbs": 1.1, "fat": 11.0, "fiber": 0.0},
-                "bread": {"calories": 265, "protein": 9.0, "carbs": 49.0, "fat": 3.0, "fiber": 4.0},
-                "greek yogurt": {"calories": 60, "protein": 10.0, "carbs": 4.0, "fat": 0.0, "fiber": 0.0},
-                "banana": {"calories": 89, "protein": 1.1, "carbs": 23.0, "fat": 0.3, "fiber": 2.6}
-            },
-            "Lunch": {
-                "chicken breast": {"calories": 110, "protein": 20.0, "carbs": 0.0, "fat": 2.4, "fiber": 0.0},
-                "mixed greens": {"calories": 25, "protein": 2.0, "carbs": 4.0, "fat": 0.0, "fiber": 2.0},
-                "olive oil": {"calories": 900, "protein": 0.0, "carbs": 0.0, "fat": 100.0, "fiber": 0.0},
-                "tomatoes": {"calories": 18, "protein": 0.9, "carbs": 4.0, "fat": 0.0, "fiber": 1.2},
-                "cucumber": {"calories": 16, "protein": 0.7, "carbs": 3.6, "fat": 0.1, "fiber": 0.5},
-                "quinoa": {"calories": 120, "protein": 4.0, "carbs": 22.0, "fat": 2.0, "fiber": 2.0},
-                "lentils": {"calories": 116, "protein": 9.0, "carbs": 20.0, "fat": 0.4, "fiber": 8.0},
-                "turkey": {"calories": 135, "protein": 25.0, "carbs": 0.0, "fat": 3.0, "fiber": 0.0}
-            },
-            "Dinner": {
-                "salmon": {"calories": 200, "protein": 20.0, "carbs": 0.0, "fat": 12.0, "fiber": 0.0},
-                "broccoli": {"calories": 25, "protein": 2.8, "carbs": 7.0, "fat": 0.4, "fiber": 2.6},
-                "carrots": {"calories": 41, "protein": 0.9, "carbs": 10.0, "fat": 0.0, "fiber": 2.8},
-                "tofu": {"calories": 76, "protein": 8.0, "carbs": 1.9, "fat": 4.8, "fiber": 0.3},
-                "beef steak": {"calories": 250, "protein": 26.0, "carbs": 0.0, "fat": 15.0, "fiber": 0.0},
-                "chickpeas": {"calories": 164, "protein": 9.0, "carbs": 27.0, "fat": 2.6, "fiber": 8.0},
-                "brown rice": {"calories": 111, "protein": 2.6, "carbs": 23.0, "fat": 0.9, "fiber": 1.8}
-            },
-            "Snack": {
-                "apple": {"calories": 52, "protein": 0.3, "carbs": 14.0, "fat": 0.2, "fiber": 2.4},
-                "peanut butter": {"calories": 588, "protein": 25.0, "carbs": 20.0, "fat": 50.0, "fiber": 6.0},
-                "nuts": {"calories": 607, "protein": 20.0, "carbs": 23.0, "fat": 54.0, "fiber": 7.0},
-                "hummus": {"calories": 166, "protein": 8.0, "carbs": 14.0, "fat": 10.0, "fiber": 6.0}
-            }
-        }
-        
-        # Get available foods for this meal type
-        available_foods = food_database.get(meal_type, food_database["Breakfast"])
-        
-        # Calculate target quantities to meet nutritional goals
-        food_items = []
-        remaining_calories = meal_calories
-        remaining_protein = meal_protein
-        remaining_carbs = meal_carbs
-        remaining_fat = meal_fat
-        remaining_fiber = meal_fiber
-        
-        # Select 2-4 food items for variety
-        num_items = min(4, len(available_foods))
-        selected_foods = list(available_foods.keys())[:num_items]
-        
-        for i, food_name in enumerate(selected_foods):
-            food_info = available_foods[food_name]
-            
-            # Calculate quantity based on remaining nutritional needs
-            if i == num_items - 1:  # Last item - use remaining needs
-                # Calculate quantity to meet remaining calories
-                if food_info["calories"] > 0:
-                    quantity = (remaining_calories / food_info["calories"]) * 100
-                else:
-                    quantity = 100
-            else:
-                # Use proportional quantities
-                proportion = 0.3 + (i * 0.2)  # 30%, 50%, 70% distribution
-                quantity = (meal_calories * proportion / food_info["calories"]) * 100
-            
-            # Ensure reasonable quantities (10g - 200g)
-            quantity = max(10, min(200, quantity))
-            
-            # Calculate actual nutritional values for this quantity
-            actual_calories = (quantity / 100) * food_info["calories"]
-            actual_protein = (quantity / 100) * food_info["protein"]
-            actual_carbs = (quantity / 100) * food_info["carbs"]
-            actual_fat = (quantity / 100) * food_info["fat"]
-            actual_fiber = (quantity / 100) * food_info["fiber"]
-            
-            # Determine appropriate unit
-            if quantity >= 100:
-                unit = "g"
-            elif quantity >= 50:
-                unit = "g"
-            elif food_name in ["apple", "banana"]:
-                unit = "medium"
-                quantity = 1
-            elif food_name in ["eggs"]:
-                unit = "pieces"
-                quantity = int(quantity / 50)  # Approximate egg weight
-            else:
-                unit = "g"
-            
-            food_items.append({
-                "item": food_name,
-                "quantity": round(quantity, 1),
-                "unit": unit,
-                "calories": round(actual_calories),
-                "protein": round(actual_protein, 1),
-                "carbs": round(actual_carbs, 1),
-                "fat": round(actual_fat, 1),
-                "fiber": round(actual_fiber, 1)
-            })
-            
-            # Update remaining nutritional needs
-            remaining_calories -= actual_calories
-            remaining_protein -= actual_protein
-            remaining_carbs -= actual_carbs
-            remaining_fat -= actual_fat
-            remaining_fiber -= actual_fiber
-        
-        return food_items
+        return [asdict(item) for item in _build_meal_food_items(meal_type, meal_calories)]
 
     def _get_personalized_breakfast_name(self, food_preference: str, primary_goals: List[str]) -> str:
         """Get personalized breakfast name based on food preference and goals"""
         if "weight_loss" in primary_goals:
-            if food_preference == "vegetarian":
-                return "High-Protein Vegetarian Breakfast Bowl"
-            elif food_preference == "vegan":
-                return "Protein-Rich Vegan Smoothie Bowl"
-            elif food_preference == "non_vegetarian":
-                return "Lean Protein Breakfast Plate"
-            else:
-                return "Weight Loss Breakfast Bowl"
+            goal = "weight_loss"
         elif "muscle_gain" in primary_goals:
-            if food_preference == "vegetarian":
-                return "Muscle Building Vegetarian Breakfast"
-            elif food_preference == "vegan":
-                return "Plant-Based Protein Power Bowl"
-            elif food_preference == "non_vegetarian":
-                return "High-Protein Breakfast Platter"
-            else:
-                return "Muscle Building Breakfast"
+            goal = "muscle_gain"
         else:
-            if food_preference == "vegetarian":
-                return "Balanced Vegetarian Breakfast Bowl"
-            elif food_preference == "vegan":
-                return "Nutritious Vegan Breakfast"
-            elif food_preference == "non_vegetarian":
-                return "Balanced Breakfast Plate"
-            else:
-                return "Healthy Breakfast Bowl"
+            goal = "default"
+        return _BREAKFAST_NAMES.get((goal, food_preference), _BREAKFAST_NAMES[(goal, "default")])
 
     def _get_personalized_breakfast_ingredients(self, food_preference: str, target_calories: int) -> List[Dict[str, Any]]:
         """Get personalized breakfast ingredients based on food preference"""
-        if food_preference == "vegetarian":
-            return [
-                {"item": "rolled oats", "quantity": 60.0, "unit": "g", "calories": 228, "protein": 8.0, "carbs": 40.0, "fat": 4.0, "fiber": 6.0},
-                {"item": "protein powder", "quantity": 30.0, "unit": "g", "calories": 120, "protein": 24.0, "carbs": 3.0, "fat": 1.0, "fiber": 0.0},
-                {"item": "almonds", "quantity": 15.0, "unit": "g", "calories": 87, "protein": 3.0, "carbs": 3.0, "fat": 8.0, "fiber": 2.0},
-                {"item": "berries", "quantity": 50.0, "unit": "g", "calories": 25, "protein": 0.5, "carbs": 6.0, "fat": 0.0, "fiber": 2.5},
-                {"item": "milk", "quantity": 240.0, "unit": "ml", "calories": 120, "protein": 8.0, "carbs": 12.0, "fat": 5.0, "fiber": 0.0}
-            ]
-        elif food_preference == "vegan":
-            return [
-                {"item": "quinoa", "quantity": 80.0, "unit": "g", "calories": 120, "protein": 4.0, "carbs": 22.0, "fat": 2.0, "fiber": 2.0},
-                {"item": "plant protein powder", "quantity": 30.0, "unit": "g", "calories": 120, "protein": 24.0, "carbs": 3.0, "fat": 1.0, "fiber": 0.0},
-                {"item": "chia seeds", "quantity": 20.0, "unit": "g", "calories": 97, "protein": 3.4, "carbs": 8.6, "fat": 8.6, "fiber": 6.8},
-                {"item": "banana", "quantity": 1.0, "unit": "medium", "calories": 105, "protein": 1.3, "carbs": 27.0, "fat": 0.4, "fiber": 3.1},
-                {"item": "almond milk", "quantity": 240.0, "unit": "ml", "calories": 60, "protein": 2.0, "carbs": 8.0, "fat": 2.5, "fiber": 0.0}
-            ]
-        elif food_preference == "non_vegetarian":
-            return [
-                {"item": "eggs", "quantity": 2.0, "unit": "pieces", "calories": 140, "protein": 12.0, "carbs": 0.0, "fat": 10.0, "fiber": 0.0},
-                {"item": "whole grain bread", "quantity": 60.0, "unit": "g", "calories": 160, "protein": 6.0, "carbs": 30.0, "fat": 2.0, "fiber": 4.0},
-                {"item": "avocado", "quantity": 50.0, "unit": "g", "calories": 80, "protein": 1.0, "carbs": 4.0, "fat": 7.0, "fiber": 3.0},
-                {"item": "spinach", "quantity": 30.0, "unit": "g", "calories": 7, "protein": 0.9, "carbs": 1.1, "fat": 0.1, "fiber": 0.7},
-                {"item": "olive oil", "quantity": 5.0, "unit": "ml", "calories": 45, "protein": 0.0, "carbs": 0.0, "fat": 5.0, "fiber": 0.0}
-            ]
-        else:  # eggetarian
-            return [
-                {"item": "eggs", "quantity": 2.0, "unit": "pieces", "calories": 140, "protein": 12.0, "carbs": 0.0, "fat": 10.0, "fiber": 0.0},
-                {"item": "rolled oats", "quantity": 60.0, "unit": "g", "calories": 228, "protein": 8.0, "carbs": 40.0, "fat": 4.0, "fiber": 6.0},
-                {"item": "milk", "quantity": 240.0, "unit": "ml", "calories": 120, "protein": 8.0, "carbs": 12.0, "fat": 5.0, "fiber": 0.0},
-                {"item": "honey", "quantity": 10.0, "unit": "g", "calories": 30, "protein": 0.0, "carbs": 8.0, "fat": 0.0, "fiber": 0.0},
-                {"item": "nuts", "quantity": 20.0, "unit": "g", "calories": 120, "protein": 4.0, "carbs": 4.0, "fat": 10.0, "fiber": 2.0}
-            ]
+        ingredients = _BREAKFAST_INGREDIENTS.get(food_preference, _EGGETARIAN_BREAKFAST_INGREDIENTS)
+        return [dict(ingredient) for ingredient in ingredients]
 
     def _get_personalized_breakfast_instructions(self, food_preference: str, who_cooks: str) -> str:
         """Get personalized breakfast instructions based on food preference and cooking skill"""
-        if who_cooks == "cook_helper":
-            return "Ask your cook to prepare this nutritious breakfast according to the recipe"
-        elif who_cooks == "family_member":
-            return "Ask a family member to help prepare this healthy breakfast"
-        else:
-            if food_preference == "vegetarian":
-                return "Cook oats with milk for 10 minutes, stir in protein powder, top with almonds and berries"
-            elif food_preference == "vegan":
-                return "Cook quinoa with almond milk, stir in plant protein powder, add chia seeds and top with banana"
-            elif food_preference == "non_vegetarian":
-                return "Scramble eggs with spinach, toast bread, and serve with sliced avocado and olive oil"
-            else:  # eggetarian
-                return "Boil eggs, cook oats with milk, and serve with honey and nuts"
\ No newline at end of file
+        if who_cooks in _DELEGATED_BREAKFAST_INSTRUCTIONS:
+            return _DELEGATED_BREAKFAST_INSTRUCTIONS[who_cooks]
+        return _BREAKFAST_INSTRUCTIONS.get(food_preference, _BREAKFAST_INSTRUCTIONS["eggetarian"])
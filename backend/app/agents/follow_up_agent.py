@@ -3,14 +3,152 @@ Follow-Up Agent - Monitors diet and workout adherence and requests updates
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Deque, Dict, Any, Final, List, Optional, Tuple
+from collections import deque
 from datetime import datetime, timedelta
+from dataclasses import dataclass, asdict
+from functools import lru_cache
 import asyncio
+import bisect
+import itertools
+import time
+
+import numpy as np
+
+try:
+    from numba import njit as _njit
+except ImportError:  # numba is optional; kernels run as plain Python without it
+    def _njit(*args, **kwargs):
+        return lambda func: func
 
 from app.agents.base_agent import BaseAgent
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of users whose last adherence status is kept
+_ADHERENCE_CACHE_SIZE: Final = 128
+# user_updates entries the adherence calculators read; a cached status is
+# reused only while all of them are unchanged
+_ADHERENCE_LOG_KEYS: Final = ("logged_calories", "target_calories", "logged_minutes", "target_minutes")
+
+# Recommendations added to an intervention when a category's adherence score
+# falls below its threshold: (category, score key, action, description, urgency)
+_INTERVENTION_RULES: Final = (
+    ("diet", "diet_score", "schedule_diet_consultation",
+     "Schedule a consultation to review and adjust diet plan", "medium"),
+    ("workout", "workout_score", "adjust_workout_intensity",
+     "Consider reducing workout intensity or frequency", "medium")
+)
+
+# Completed update requests are kept this long, then pruned
+_COMPLETED_REQUEST_TTL: Final = timedelta(days=7)
+# Most update requests kept per user; the oldest are dropped beyond this
+_MAX_REQUESTS_PER_USER: Final = 200
+# Minimum time between two prunes of completed update requests
+_PRUNE_INTERVAL: Final = timedelta(hours=1)
+
+_ADHERENCE_THRESHOLDS: Final = {
+    "diet": 0.8,  # 80% adherence threshold
+    "workout": 0.7  # 70% adherence threshold
+}
+
+# Complexity levels and the highest plan score that still falls in each of
+# the first two, per plan kind; anything above the last bound is "complex"
+_COMPLEXITY_LEVELS: Final = ("simple", "moderate", "complex")
+_COMPLEXITY_BOUNDS: Final = {
+    "diet": (3, 6),
+    "workout": (4, 8)
+}
+
+_COMPLEXITY_SCORES: Final = {"simple": 1, "moderate": 1.5, "complex": 2}
+
+# Follow-up interval in hours for every (diet, workout) complexity pair:
+# 24h scaled by the mean complexity score, bounded to 6-72 hours
+_FOLLOW_UP_FREQUENCY_HOURS: Final = {
+    (diet, workout): max(6, min(72, int(24 * (diet_score + workout_score) / 2)))
+    for diet, diet_score in _COMPLEXITY_SCORES.items()
+    for workout, workout_score in _COMPLEXITY_SCORES.items()
+}
+
+
+@_njit(cache=True, fastmath=True)
+def _adherence_ratio(logged, target):
+    """Mean of logged/target over entries with a positive target, each ratio capped to 0-1"""
+    total = 0.0
+    count = 0
+    for i in range(logged.shape[0]):
+        if target[i] > 0.0:
+            total += min(max(logged[i] / target[i], 0.0), 1.0)
+            count += 1
+    return total / count if count > 0 else 0.0
+
+
+def _adherence_key(user_updates: Optional[Dict[str, Any]]) -> Tuple:
+    """Content fingerprint of the logs adherence is computed from"""
+    if not user_updates:
+        return ()
+    return tuple(
+        None if values is None else np.asarray(values, dtype=np.float64).tobytes()
+        for values in map(user_updates.get, _ADHERENCE_LOG_KEYS)
+    )
+
+
+def _has_logs(values: Any) -> bool:
+    """Whether a log is present and non-empty; safe for lists and NumPy arrays alike"""
+    return values is not None and np.size(values) > 0
+
+
+def _score_logs(logged: List[float], target: List[float]) -> float:
+    """Adherence score for paired logged/target values, ignoring unpaired trailing entries"""
+    n = min(len(logged), len(target))
+    return float(_adherence_ratio(
+        np.asarray(logged[:n], dtype=np.float64),
+        np.asarray(target[:n], dtype=np.float64)
+    ))
+
+
+@dataclass(slots=True)
+class FollowUpSchedule:
+    """Follow-up schedule for a single user"""
+    created_at: datetime
+    last_follow_up: Optional[datetime]
+    next_follow_up: datetime
+    frequency_hours: float
+    diet_complexity: str
+    workout_complexity: str
+    total_follow_ups: int = 0
+
+
+@lru_cache(maxsize=64)
+def _diet_questions_for(has_restrictions: bool, has_supplements: bool) -> Tuple[str, ...]:
+    """Diet follow-up questions for a plan with the given features"""
+    questions = (
+        "How well are you following your meal schedule?",
+        "Are you experiencing any cravings or hunger between meals?",
+        "How do you feel after eating the recommended foods?"
+    )
+    if has_restrictions:
+        questions += ("Are you finding it easy to avoid restricted foods?",)
+    if has_supplements:
+        questions += ("Are you taking your supplements as recommended?",)
+    return questions
+
+
+@lru_cache(maxsize=64)
+def _workout_questions_for(high_intensity: bool, high_frequency: bool) -> Tuple[str, ...]:
+    """Workout follow-up questions for a plan with the given features"""
+    questions = (
+        "How are you feeling during your workouts?",
+        "Are you able to complete all planned exercises?",
+        "How is your energy level after workouts?"
+    )
+    if high_intensity:
+        questions += ("Are you experiencing any muscle soreness or fatigue?",)
+    if high_frequency:
+        questions += ("Are you getting enough rest between workout days?",)
+    return questions
+
+
 class FollowUpAgent(BaseAgent):
     """
     Follow-Up Agent responsible for:
@@ -22,12 +160,20 @@ class FollowUpAgent(BaseAgent):
     
     def __init__(self):
         super().__init__("FollowUpAgent")
-        self.follow_up_schedules = {}  # user_id -> schedule
-        self.update_requests = {}      # user_id -> pending requests
-        self.adherence_thresholds = {
-            "diet": 0.8,  # 80% adherence threshold
-            "workout": 0.7  # 70% adherence threshold
-        }
+        self.follow_up_schedules: Dict[str, FollowUpSchedule] = {}  # user_id -> schedule
+        self.update_requests: Dict[str, Deque[Dict[str, Any]]] = {}  # user_id -> pending requests
+        self._request_index: Dict[str, Dict[str, Dict[str, Any]]] = {}  # user_id -> request_id -> request
+        self._urgent_counts: Dict[str, int] = {}  # user_id -> pending high-priority requests
+        self._pending_insights: Dict[Tuple, asyncio.Future] = {}  # in-flight MCP insight calls
+        # Request/intervention ids are unique across restarts: a startup epoch plus a running counter
+        self._id_counter = itertools.count(1)
+        self._id_epoch = int(time.time())
+        self._last_prune = datetime.min
+        self._adherence_cache: Dict[str, Tuple[Tuple, Dict[str, Any]]] = {}  # user_id -> (log fingerprint, status)
+    
+    def _next_id(self, prefix: str) -> str:
+        """Build a unique id for an update request or intervention"""
+        return f"{prefix}_{self._id_epoch}_{next(self._id_counter)}"
     
     async def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -41,6 +187,13 @@ class FollowUpAgent(BaseAgent):
         """
         try:
             await self.update_status("processing")
+            now = datetime.utcnow()
+            now_iso = now.isoformat()
+            
+            # Bound memory by dropping long-completed update requests
+            if now - self._last_prune >= _PRUNE_INTERVAL:
+                self._prune_completed_requests(now)
+                self._last_prune = now
             
             # Extract user data and plans
             user_data = state.get("user_data", {})
@@ -51,40 +204,50 @@ class FollowUpAgent(BaseAgent):
             if not user_id:
                 raise ValueError("User ID is required for follow-up processing")
             
+            # Fast path: no follow-up due, nothing urgent pending and the logged
+            # content unchanged since a check that needed no intervention
+            schedule = self.follow_up_schedules.get(user_id)
+            adherence_key = None
+            if schedule and not await self._should_request_update(user_id, now):
+                try:
+                    adherence_key = _adherence_key(state.get("user_updates"))
+                except (TypeError, ValueError):
+                    pass  # Malformed logs; the full adherence check reports them
+                adherence_status = None if adherence_key is None else self._cached_adherence(user_id, adherence_key)
+                if adherence_status and not adherence_status.get("needs_intervention"):
+                    state["follow_up_status"] = self._follow_up_status(user_id, schedule, adherence_status)
+                    await self.increment_success()
+                    return state
+            
             # Initialize MCP client if available
             if user_id:
                 self.initialize_mcp_client(user_id)
             
             # Initialize follow-up schedule for new users
             if user_id not in self.follow_up_schedules:
-                await self._initialize_follow_up_schedule(user_id, diet_plan, workout_plan)
+                await self._initialize_follow_up_schedule(user_id, diet_plan, workout_plan, now)
+            schedule = self.follow_up_schedules.get(user_id)
             
             # Check if it's time for follow-up
-            if await self._should_request_update(user_id):
-                # Request updates from user
-                update_request = await self._request_user_update(user_id, diet_plan, workout_plan)
+            if await self._should_request_update(user_id, now):
+                # Request updates from user, share information with Tracker Agent
+                # and update the follow-up schedule concurrently
+                update_request, tracking_data, _ = await asyncio.gather(
+                    self._request_user_update(user_id, diet_plan, workout_plan, now_iso),
+                    self._prepare_tracking_data(user_id, diet_plan, workout_plan, now_iso, schedule),
+                    self._update_follow_up_schedule(user_id, now)
+                )
                 state["follow_up_request"] = update_request
-                
-                # Share information with Tracker Agent
-                tracking_data = await self._prepare_tracking_data(user_id, diet_plan, workout_plan)
                 state["tracking_data"] = tracking_data
-                
-                # Update follow-up schedule
-                await self._update_follow_up_schedule(user_id)
             
             # Check adherence and trigger interventions if needed
-            adherence_status = await self._check_adherence(user_id, state)
+            adherence_status = await self._check_adherence(user_id, state, adherence_key)
             if adherence_status.get("needs_intervention"):
-                intervention = await self._create_intervention(user_id, adherence_status)
+                intervention = await self._create_intervention(user_id, adherence_status, now_iso)
                 state["intervention"] = intervention
             
             # Update state with follow-up information
-            state["follow_up_status"] = {
-                "last_follow_up": self.follow_up_schedules.get(user_id, {}).get("last_follow_up"),
-                "next_follow_up": self.follow_up_schedules.get(user_id, {}).get("next_follow_up"),
-                "pending_requests": len(self.update_requests.get(user_id, [])),
-                "adherence_score": adherence_status.get("overall_score", 0)
-            }
+            state["follow_up_status"] = self._follow_up_status(user_id, schedule, adherence_status)
             
             await self.increment_success()
             return state
@@ -94,59 +257,54 @@ class FollowUpAgent(BaseAgent):
             state["follow_up_error"] = error_response
             return state
     
-    async def _initialize_follow_up_schedule(self, user_id: str, diet_plan: Dict, workout_plan: Dict):
+    async def _initialize_follow_up_schedule(self, user_id: str, diet_plan: Dict, workout_plan: Dict,
+                                             now: Optional[datetime] = None):
         """Initialize follow-up schedule for a new user"""
         try:
+            now = now or datetime.utcnow()
             # Determine follow-up frequency based on plan complexity
-            diet_complexity = self._assess_plan_complexity(diet_plan)
-            workout_complexity = self._assess_plan_complexity(workout_plan)
+            diet_complexity = self._assess_plan_complexity(diet_plan, "diet")
+            workout_complexity = self._assess_plan_complexity(workout_plan, "workout")
             
             # Set initial follow-up schedule
             follow_up_frequency = self._calculate_follow_up_frequency(diet_complexity, workout_complexity)
             
-            self.follow_up_schedules[user_id] = {
-                "created_at": datetime.utcnow(),
-                "last_follow_up": None,
-                "next_follow_up": datetime.utcnow() + timedelta(hours=follow_up_frequency),
-                "frequency_hours": follow_up_frequency,
-                "diet_complexity": diet_complexity,
-                "workout_complexity": workout_complexity,
-                "total_follow_ups": 0
-            }
+            self.follow_up_schedules[user_id] = FollowUpSchedule(
+                created_at=now,
+                last_follow_up=None,
+                next_follow_up=now + timedelta(hours=follow_up_frequency),
+                frequency_hours=follow_up_frequency,
+                diet_complexity=diet_complexity,
+                workout_complexity=workout_complexity
+            )
             
             logger.info(f"Initialized follow-up schedule for user {user_id}")
             
         except Exception as e:
             logger.error(f"Failed to initialize follow-up schedule for user {user_id}: {str(e)}")
     
-    async def _should_request_update(self, user_id: str) -> bool:
+    async def _should_request_update(self, user_id: str, now: Optional[datetime] = None) -> bool:
         """Check if it's time to request an update from the user"""
-        try:
-            schedule = self.follow_up_schedules.get(user_id)
-            if not schedule:
-                return False
-            
-            # Check if next follow-up time has passed
-            if schedule["next_follow_up"] and datetime.utcnow() >= schedule["next_follow_up"]:
-                return True
-            
-            # Check if there are pending urgent requests
-            pending_requests = self.update_requests.get(user_id, [])
-            urgent_requests = [req for req in pending_requests if req.get("priority") == "high"]
-            
-            return len(urgent_requests) > 0
-            
-        except Exception as e:
-            logger.error(f"Error checking update requirement for user {user_id}: {str(e)}")
+        schedule = self.follow_up_schedules.get(user_id)
+        if not schedule:
             return False
+        
+        # Check if next follow-up time has passed
+        if schedule.next_follow_up and (now or datetime.utcnow()) >= schedule.next_follow_up:
+            return True
+        
+        # Check if there are pending urgent requests
+        return self._urgent_counts.get(user_id, 0) > 0
     
-    async def _request_user_update(self, user_id: str, diet_plan: Dict, workout_plan: Dict) -> Dict[str, Any]:
+    async def _request_user_update(self, user_id: str, diet_plan: Dict, workout_plan: Dict,
+                                   now_iso: Optional[str] = None) -> Dict[str, Any]:
         """Request updates from the user"""
         try:
+            now_iso = now_iso or datetime.utcnow().isoformat()
             # Create update request
             update_request = {
-                "request_id": f"update_{user_id}_{datetime.utcnow().timestamp()}",
-                "timestamp": datetime.utcnow().isoformat(),
+                "request_id": self._next_id(f"update_{user_id}"),
+                "timestamp": now_iso,
                 "type": "follow_up",
                 "priority": "medium",
                 "diet_questions": self._generate_diet_questions(diet_plan),
@@ -154,18 +312,23 @@ class FollowUpAgent(BaseAgent):
                 "status": "pending"
             }
             
-            # Store the request
-            if user_id not in self.update_requests:
-                self.update_requests[user_id] = []
-            self.update_requests[user_id].append(update_request)
+            # Store the request, dropping the oldest one once the user's history is full
+            requests = self.update_requests.setdefault(user_id, deque(maxlen=_MAX_REQUESTS_PER_USER))
+            index = self._request_index.setdefault(user_id, {})
+            if len(requests) == requests.maxlen:
+                self._forget_request(user_id, requests.popleft())
+            requests.append(update_request)
+            index[update_request["request_id"]] = update_request
+            if update_request["priority"] == "high":
+                self._urgent_counts[user_id] = self._urgent_counts.get(user_id, 0) + 1
             
             # Use MCP tools if available for enhanced follow-up
             if self.mcp_client:
                 try:
                     # Get health insights for personalized questions
-                    health_insights = await self.get_health_insights(user_data={"user_id": user_id})
-                    if health_insights.get("success"):
-                        update_request["health_context"] = health_insights.get("result", {})
+                    success, health_context = await self._get_shared_health_insights(user_id)
+                    if success:
+                        update_request["health_context"] = health_context
                 except Exception as e:
                     logger.warning(f"Could not get health insights for follow-up: {str(e)}")
             
@@ -176,12 +339,17 @@ class FollowUpAgent(BaseAgent):
             logger.error(f"Failed to create update request for user {user_id}: {str(e)}")
             return {}
     
-    async def _prepare_tracking_data(self, user_id: str, diet_plan: Dict, workout_plan: Dict) -> Dict[str, Any]:
+    async def _prepare_tracking_data(self, user_id: str, diet_plan: Dict, workout_plan: Dict,
+                                     now_iso: Optional[str] = None,
+                                     schedule: Optional[FollowUpSchedule] = None) -> Dict[str, Any]:
         """Prepare data to share with Tracker Agent"""
         try:
+            now_iso = now_iso or datetime.utcnow().isoformat()
+            if schedule is None:
+                schedule = self.follow_up_schedules.get(user_id)
             tracking_data = {
                 "user_id": user_id,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": now_iso,
                 "diet_plan": {
                     "plan_id": diet_plan.get("plan_id"),
                     "meals": diet_plan.get("meals", []),
@@ -195,8 +363,8 @@ class FollowUpAgent(BaseAgent):
                     "intensity": workout_plan.get("intensity", "moderate")
                 },
                 "follow_up_context": {
-                    "last_follow_up": self.follow_up_schedules.get(user_id, {}).get("last_follow_up"),
-                    "total_follow_ups": self.follow_up_schedules.get(user_id, {}).get("total_follow_ups", 0)
+                    "last_follow_up": schedule.last_follow_up if schedule else None,
+                    "total_follow_ups": schedule.total_follow_ups if schedule else 0
                 }
             }
             
@@ -206,16 +374,40 @@ class FollowUpAgent(BaseAgent):
             logger.error(f"Failed to prepare tracking data for user {user_id}: {str(e)}")
             return {}
     
-    async def _check_adherence(self, user_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    def _follow_up_status(self, user_id: str, schedule: Optional[FollowUpSchedule],
+                          adherence_status: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the follow-up status summary returned in the workflow state"""
+        return {
+            "last_follow_up": schedule.last_follow_up if schedule else None,
+            "next_follow_up": schedule.next_follow_up if schedule else None,
+            "pending_requests": len(self.update_requests.get(user_id, [])),
+            "adherence_score": adherence_status.get("overall_score", 0)
+        }
+    
+    def _cached_adherence(self, user_id: str, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Last adherence status for the user while the logs it was computed from are unchanged"""
+        cached = self._adherence_cache.get(user_id)
+        if cached and cached[0] == key:
+            return cached[1]
+        return None
+    
+    async def _check_adherence(self, user_id: str, state: Dict[str, Any],
+                               key: Optional[Tuple] = None) -> Dict[str, Any]:
         """Check user adherence to diet and workout plans"""
         try:
             # Get tracking data from state
-            tracking_data = state.get("tracking_data", {})
-            user_updates = state.get("user_updates", {})
+            tracking_data = state.get("tracking_data")
+            user_updates = state.get("user_updates")
+            
+            if key is None:
+                key = _adherence_key(user_updates)
+            cached = self._cached_adherence(user_id, key)
+            if cached:
+                return cached
             
             # Calculate adherence scores
-            diet_adherence = self._calculate_diet_adherence(tracking_data, user_updates)
-            workout_adherence = self._calculate_workout_adherence(tracking_data, user_updates)
+            diet_adherence = self._calculate_diet_adherence(tracking_data or {}, user_updates or {})
+            workout_adherence = self._calculate_workout_adherence(tracking_data or {}, user_updates or {})
             
             overall_score = (diet_adherence + workout_adherence) / 2
             
@@ -224,55 +416,56 @@ class FollowUpAgent(BaseAgent):
                 "workout_score": workout_adherence,
                 "overall_score": overall_score,
                 "needs_intervention": overall_score < 0.6,  # Below 60%
-                "diet_threshold_met": diet_adherence >= self.adherence_thresholds["diet"],
-                "workout_threshold_met": workout_adherence >= self.adherence_thresholds["workout"]
+                "diet_threshold_met": diet_adherence >= _ADHERENCE_THRESHOLDS["diet"],
+                "workout_threshold_met": workout_adherence >= _ADHERENCE_THRESHOLDS["workout"]
             }
             
+            self._adherence_cache.pop(user_id, None)
+            if len(self._adherence_cache) >= _ADHERENCE_CACHE_SIZE:
+                # Evict the least recently computed entry
+                del self._adherence_cache[next(iter(self._adherence_cache))]
+            self._adherence_cache[user_id] = (key, adherence_status)
+            
             return adherence_status
             
         except Exception as e:
             logger.error(f"Failed to check adherence for user {user_id}: {str(e)}")
             return {"overall_score": 0, "needs_intervention": False}
     
-    async def _create_intervention(self, user_id: str, adherence_status: Dict[str, Any]) -> Dict[str, Any]:
+    async def _create_intervention(self, user_id: str, adherence_status: Dict[str, Any],
+                                   now_iso: Optional[str] = None) -> Dict[str, Any]:
         """Create intervention plan for users with low adherence"""
         try:
+            now_iso = now_iso or datetime.utcnow().isoformat()
             intervention = {
-                "intervention_id": f"intervention_{user_id}_{datetime.utcnow().timestamp()}",
+                "intervention_id": self._next_id(f"intervention_{user_id}"),
                 "user_id": user_id,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": now_iso,
                 "type": "adherence_intervention",
                 "priority": "high" if adherence_status["overall_score"] < 0.4 else "medium",
                 "recommendations": []
             }
             
             # Generate specific recommendations based on adherence scores
-            if adherence_status["diet_score"] < self.adherence_thresholds["diet"]:
-                intervention["recommendations"].append({
-                    "category": "diet",
-                    "action": "schedule_diet_consultation",
-                    "description": "Schedule a consultation to review and adjust diet plan",
-                    "urgency": "medium"
-                })
-            
-            if adherence_status["workout_score"] < self.adherence_thresholds["workout"]:
-                intervention["recommendations"].append({
-                    "category": "workout",
-                    "action": "adjust_workout_intensity",
-                    "description": "Consider reducing workout intensity or frequency",
-                    "urgency": "medium"
-                })
+            for category, score_key, action, description, urgency in _INTERVENTION_RULES:
+                if adherence_status[score_key] < _ADHERENCE_THRESHOLDS[category]:
+                    intervention["recommendations"].append({
+                        "category": category,
+                        "action": action,
+                        "description": description,
+                        "urgency": urgency
+                    })
             
             # Use MCP tools for enhanced recommendations if available
             if self.mcp_client:
                 try:
                     # Get wellness recommendations
-                    wellness_recs = await self.get_health_insights(
-                        user_data={"user_id": user_id},
+                    success, wellness_recs = await self._get_shared_health_insights(
+                        user_id,
                         context="adherence_intervention"
                     )
-                    if wellness_recs.get("success"):
-                        intervention["wellness_recommendations"] = wellness_recs.get("result", {})
+                    if success:
+                        intervention["wellness_recommendations"] = wellness_recs
                 except Exception as e:
                     logger.warning(f"Could not get wellness recommendations: {str(e)}")
             
@@ -282,142 +475,141 @@ class FollowUpAgent(BaseAgent):
             logger.error(f"Failed to create intervention for user {user_id}: {str(e)}")
             return {}
     
-    async def _update_follow_up_schedule(self, user_id: str):
+    async def _get_shared_health_insights(self, user_id: str, **kwargs) -> Tuple[bool, Dict[str, Any]]:
+        """Get health insights, sharing one MCP call between concurrent callers for the same query"""
+        key = (user_id, tuple(sorted(kwargs.items())))
+        pending = self._pending_insights.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(
+                self.get_health_insights_snapshot(user_data={"user_id": user_id}, **kwargs)
+            )
+            self._pending_insights[key] = pending
+            pending.add_done_callback(lambda _: self._pending_insights.pop(key, None))
+        # Shield so one caller being cancelled does not cancel the call for the others
+        return await asyncio.shield(pending)
+    
+    async def _update_follow_up_schedule(self, user_id: str, now: Optional[datetime] = None):
         """Update follow-up schedule after requesting updates"""
         try:
             if user_id in self.follow_up_schedules:
+                now = now or datetime.utcnow()
                 schedule = self.follow_up_schedules[user_id]
-                schedule["last_follow_up"] = datetime.utcnow()
-                schedule["total_follow_ups"] += 1
+                schedule.last_follow_up = now
+                schedule.total_follow_ups += 1
                 
                 # Adjust frequency based on adherence and user response
                 # More frequent follow-ups for users with low adherence
                 adherence_score = getattr(self, '_last_adherence_score', 0.7)
                 if adherence_score < 0.5:
-                    schedule["frequency_hours"] = max(6, schedule["frequency_hours"] * 0.8)  # More frequent
+                    schedule.frequency_hours = max(6, schedule.frequency_hours * 0.8)  # More frequent
                 elif adherence_score > 0.8:
-                    schedule["frequency_hours"] = min(72, schedule["frequency_hours"] * 1.2)  # Less frequent
+                    schedule.frequency_hours = min(72, schedule.frequency_hours * 1.2)  # Less frequent
                 
-                schedule["next_follow_up"] = datetime.utcnow() + timedelta(hours=schedule["frequency_hours"])
+                schedule.next_follow_up = now + timedelta(hours=schedule.frequency_hours)
                 
                 logger.info(f"Updated follow-up schedule for user {user_id}")
                 
         except Exception as e:
             logger.error(f"Failed to update follow-up schedule for user {user_id}: {str(e)}")
     
-    def _assess_plan_complexity(self, plan: Dict) -> str:
+    def _assess_plan_complexity(self, plan: Dict, plan_kind: str) -> str:
         """Assess the complexity of a diet or workout plan"""
-        if not plan:
+        bounds = _COMPLEXITY_BOUNDS.get(plan_kind)
+        if not plan or bounds is None:
             return "simple"
         
-        # Diet plan complexity
-        if "diet" in str(plan).lower():
-            meals = plan.get("meals", [])
-            restrictions = plan.get("dietary_restrictions", [])
-            complexity_score = len(meals) + len(restrictions) * 2
-            
-            if complexity_score <= 3:
-                return "simple"
-            elif complexity_score <= 6:
-                return "moderate"
-            else:
-                return "complex"
-        
-        # Workout plan complexity
-        elif "workout" in str(plan).lower():
-            exercises = plan.get("exercises", [])
-            frequency = plan.get("frequency", {})
-            complexity_score = len(exercises) + len(frequency) * 2
-            
-            if complexity_score <= 4:
-                return "simple"
-            elif complexity_score <= 8:
-                return "moderate"
-            else:
-                return "complex"
+        if plan_kind == "diet":
+            complexity_score = len(plan.get("meals", [])) + len(plan.get("dietary_restrictions", [])) * 2
+        else:
+            complexity_score = len(plan.get("exercises", [])) + len(plan.get("frequency", {})) * 2
         
-        return "simple"
+        # bisect_left keeps a score equal to a bound in the lower level
+        return _COMPLEXITY_LEVELS[bisect.bisect_left(bounds, complexity_score)]
     
     def _calculate_follow_up_frequency(self, diet_complexity: str, workout_complexity: str) -> int:
         """Calculate follow-up frequency based on plan complexity"""
-        complexity_scores = {"simple": 1, "moderate": 1.5, "complex": 2}
-        
-        diet_score = complexity_scores.get(diet_complexity, 1)
-        workout_score = complexity_scores.get(workout_complexity, 1)
-        
-        # Base frequency: 24 hours
-        base_frequency = 24
-        
-        # Adjust based on complexity
-        adjusted_frequency = base_frequency * (diet_score + workout_score) / 2
-        
-        # Ensure reasonable bounds (6-72 hours)
-        return max(6, min(72, int(adjusted_frequency)))
+        return _FOLLOW_UP_FREQUENCY_HOURS.get((diet_complexity, workout_complexity), 24)
     
-    def _generate_diet_questions(self, diet_plan: Dict) -> List[str]:
+    def _generate_diet_questions(self, diet_plan: Dict) -> Tuple[str, ...]:
         """Generate personalized diet follow-up questions"""
-        questions = [
-            "How well are you following your meal schedule?",
-            "Are you experiencing any cravings or hunger between meals?",
-            "How do you feel after eating the recommended foods?"
-        ]
-        
-        if diet_plan and diet_plan.get("dietary_restrictions"):
-            questions.append("Are you finding it easy to avoid restricted foods?")
-        
-        if diet_plan and diet_plan.get("supplements"):
-            questions.append("Are you taking your supplements as recommended?")
-        
-        return questions
+        if not diet_plan:
+            return _diet_questions_for(False, False)
+        return _diet_questions_for(
+            bool(diet_plan.get("dietary_restrictions")),
+            bool(diet_plan.get("supplements"))
+        )
     
-    def _generate_workout_questions(self, workout_plan: Dict) -> List[str]:
+    def _generate_workout_questions(self, workout_plan: Dict) -> Tuple[str, ...]:
         """Generate personalized workout follow-up questions"""
-        questions = [
-            "How are you feeling during your workouts?",
-            "Are you able to complete all planned exercises?",
-            "How is your energy level after workouts?"
-        ]
-        
-        if workout_plan and workout_plan.get("intensity") == "high":
-            questions.append("Are you experiencing any muscle soreness or fatigue?")
-        
-        if workout_plan and workout_plan.get("frequency", {}).get("days_per_week", 0) > 4:
-            questions.append("Are you getting enough rest between workout days?")
-        
-        return questions
+        if not workout_plan:
+            return _workout_questions_for(False, False)
+        return _workout_questions_for(
+            workout_plan.get("intensity") == "high",
+            workout_plan.get("frequency", {}).get("days_per_week", 0) > 4
+        )
     
     def _calculate_diet_adherence(self, tracking_data: Dict, user_updates: Dict) -> float:
         """Calculate diet adherence score (0.0 to 1.0)"""
-        try:
-            # This would typically use real tracking data
-            # For now, return a mock score
-            return 0.75  # 75% adherence
-        except Exception as e:
-            logger.error(f"Error calculating diet adherence: {str(e)}")
-            return 0.5
+        # Daily logged calories against the plan's daily targets
+        logged = user_updates.get("logged_calories")
+        target = user_updates.get("target_calories")
+        if _has_logs(logged) and _has_logs(target):
+            return _score_logs(logged, target)
+        # No logs yet, return a mock score
+        return 0.75  # 75% adherence
     
     def _calculate_workout_adherence(self, tracking_data: Dict, user_updates: Dict) -> float:
         """Calculate workout adherence score (0.0 to 1.0)"""
-        try:
-            # This would typically use real tracking data
-            # For now, return a mock score
-            return 0.65  # 65% adherence
-        except Exception as e:
-            logger.error(f"Error calculating workout adherence: {str(e)}")
-            return 0.5
+        # Logged workout minutes against the planned minutes per session
+        logged = user_updates.get("logged_minutes")
+        target = user_updates.get("target_minutes")
+        if _has_logs(logged) and _has_logs(target):
+            return _score_logs(logged, target)
+        # No logs yet, return a mock score
+        return 0.65  # 65% adherence
+    
+    def _forget_request(self, user_id: str, request: Dict[str, Any]):
+        """Remove a request dropped from a user's history from the index and urgent count"""
+        self._request_index.get(user_id, {}).pop(request.get("request_id"), None)
+        if request.get("status") != "completed" and request.get("priority") == "high":
+            self._urgent_counts[user_id] -= 1
+    
+    def _prune_completed_requests(self, now: datetime):
+        """Drop completed update requests older than the retention window"""
+        # completed_at values are naive UTC isoformat strings, so they order lexically
+        cutoff = (now - _COMPLETED_REQUEST_TTL).isoformat()
+        pruned = 0
+        for user_id in list(self.update_requests):
+            index = self._request_index.get(user_id, {})
+            kept = []
+            for request in self.update_requests[user_id]:
+                if request.get("status") == "completed" and request.get("completed_at", "") < cutoff:
+                    index.pop(request.get("request_id"), None)
+                    pruned += 1
+                else:
+                    kept.append(request)
+            
+            if kept:
+                self.update_requests[user_id] = deque(kept, maxlen=_MAX_REQUESTS_PER_USER)
+            else:
+                del self.update_requests[user_id]
+                self._request_index.pop(user_id, None)
+        
+        if pruned:
+            logger.info(f"Pruned {pruned} completed update requests")
     
     async def get_follow_up_status(self, user_id: str) -> Dict[str, Any]:
         """Get current follow-up status for a user"""
         try:
-            schedule = self.follow_up_schedules.get(user_id, {})
+            schedule = self.follow_up_schedules.get(user_id)
             requests = self.update_requests.get(user_id, [])
             
             return {
                 "user_id": user_id,
-                "schedule": schedule,
+                "schedule": asdict(schedule) if schedule else {},
                 "pending_requests": len(requests),
-                "last_update": schedule.get("last_follow_up"),
-                "next_update": schedule.get("next_follow_up")
+                "last_update": schedule.last_follow_up if schedule else None,
+                "next_update": schedule.next_follow_up if schedule else None
             }
         except Exception as e:
             logger.error(f"Failed to get follow-up status for user {user_id}: {str(e)}")
@@ -427,11 +619,12 @@ class FollowUpAgent(BaseAgent):
         """Mark an update request as completed"""
         try:
             if user_id in self.update_requests:
-                for request in self.update_requests[user_id]:
-                    if request.get("request_id") == request_id:
-                        request["status"] = "completed"
-                        request["completed_at"] = datetime.utcnow().isoformat()
-                        break
+                request = self._request_index.get(user_id, {}).get(request_id)
+                if request:
+                    if request.get("status") != "completed" and request.get("priority") == "high":
+                        self._urgent_counts[user_id] -= 1
+                    request["status"] = "completed"
+                    request["completed_at"] = datetime.utcnow().isoformat()
                 
                 logger.info(f"Marked update request {request_id} as completed for user {user_id}")
                 
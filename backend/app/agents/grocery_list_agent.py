@@ -3,14 +3,169 @@ Grocery List Generator Agent - Creates grocery lists from meal plans
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from dataclasses import dataclass, fields
+from functools import lru_cache
 import asyncio
+import time
+from types import MappingProxyType
+
+import numpy as np
+
+try:
+    from numba import njit as _njit
+    _HAS_NUMBA = True
+except ImportError:  # numba is optional; category totals fall back to np.bincount
+    _HAS_NUMBA = False
+    
+    def _njit(*args, **kwargs):
+        return lambda func: func
 
 from app.agents.base_agent import BaseAgent
 
 logger = logging.getLogger(__name__)
 
+# Lists with at least this many items total their categories with Numba or NumPy
+_VECTORIZE_MIN_ITEMS = 64
+
+# Base price estimates (in USD) per unit of quantity
+_BASE_PRICES = {
+    "milk": 4.50,
+    "bread": 3.00,
+    "eggs": 5.00,
+    "chicken": 8.00,
+    "vegetables": 2.50,
+    "fruits": 3.00,
+    "grains": 2.00,
+    "dairy": 4.00
+}
+
+# Shopping priority by ingredient; anything else is low priority
+_HIGH_PRIORITY_INGREDIENTS = frozenset({"milk", "bread", "eggs", "vegetables", "fruits"})
+_MEDIUM_PRIORITY_INGREDIENTS = frozenset({"meat", "fish", "poultry", "grains"})
+_INGREDIENT_PRIORITY = {
+    **dict.fromkeys(_HIGH_PRIORITY_INGREDIENTS, "high"),
+    **dict.fromkeys(_MEDIUM_PRIORITY_INGREDIENTS, "medium")
+}
+
+# Shopping notes keyed by (category, ingredient)
+_ITEM_NOTES = {
+    ("proteins", "chicken"): "Look for fresh, not frozen",
+    ("proteins", "fish"): "Look for fresh, not frozen",
+    ("proteins", "tofu"): "Check expiration date",
+    ("vegetables", "lettuce"): "Choose crisp, vibrant leaves",
+    ("vegetables", "spinach"): "Choose crisp, vibrant leaves",
+    ("vegetables", "tomatoes"): "Select firm, unblemished pieces",
+    ("vegetables", "bell_peppers"): "Select firm, unblemished pieces",
+    ("fruits", "bananas"): "Choose based on ripeness preference",
+    ("fruits", "avocados"): "Choose based on ripeness preference",
+    ("fruits", "berries"): "Check for mold, avoid crushed packages"
+}
+
+# Substitute ingredients keyed by (category, ingredient); the tuples are
+# shared by every grocery item that uses them
+_ITEM_ALTERNATIVES = {
+    ("proteins", "chicken"): ("turkey", "pork", "beef"),
+    ("proteins", "fish"): ("shrimp", "salmon", "tilapia"),
+    ("vegetables", "broccoli"): ("cauliflower", "asparagus", "green_beans"),
+    ("vegetables", "spinach"): ("kale", "arugula", "mixed_greens"),
+    ("grains", "quinoa"): ("rice", "couscous", "farro"),
+    ("grains", "oats"): ("granola", "cereal", "bread")
+}
+
+
+@dataclass(frozen=True, slots=True)
+class GroceryItem:
+    """A single line of a generated grocery list"""
+    ingredient: str
+    category: str
+    quantity: float
+    unit: str
+    priority: str
+    estimated_price: float
+    notes: str
+    alternatives: Tuple[str, ...]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict form used when the item is written to agent state"""
+        return {name: getattr(self, name) for name in _GROCERY_ITEM_FIELDS}
+
+
+_GROCERY_ITEM_FIELDS = tuple(f.name for f in fields(GroceryItem))
+
+
+@lru_cache(maxsize=1024)
+def _rounded_quantity(quantity_needed: float, per_serving: float, unit: str) -> float:
+    """Total quantity for the servings needed, rounded to a sensible step for the unit"""
+    total_quantity = quantity_needed * per_serving
+    if unit == "pounds":
+        return round(total_quantity, 2)
+    elif unit == "cups":
+        return round(total_quantity, 1)
+    return round(total_quantity)
+
+
+@lru_cache(maxsize=1024)
+def _item_price_cents(ingredient: str, quantity: float) -> int:
+    """Estimated price in US cents for a quantity of an ingredient"""
+    return round(_BASE_PRICES.get(ingredient, 3.00) * quantity * 100)
+
+
+def _item_columns(grocery_list: Dict[str, Any]) -> Tuple[List[str], List[int]]:
+    """Per-item categories and prices in cents of a grocery list, parallel to its items"""
+    items = grocery_list.get("items", [])
+    categories = grocery_list.get("item_categories")
+    price_cents = grocery_list.get("item_price_cents")
+    if categories is None or price_cents is None or len(categories) != len(items) or len(price_cents) != len(items):
+        categories = [
+            item.category if isinstance(item, GroceryItem) else item.get("category", "other")
+            for item in items
+        ]
+        price_cents = [
+            round((item.estimated_price if isinstance(item, GroceryItem) else item.get("estimated_price", 0)) * 100)
+            for item in items
+        ]
+    return categories, price_cents
+
+
+@_njit(cache=True)
+def _segment_sums(codes, cents, num_segments):
+    """Sum integer cents into one slot per category code"""
+    out = np.zeros(num_segments, np.int64)
+    for i in range(codes.size):
+        out[codes[i]] += cents[i]
+    return out
+
+
+def _category_totals(categories: List[str], price_cents: List[int]) -> Dict[str, int]:
+    """Total price in cents per category, keyed in the order categories first appear"""
+    index: Dict[str, int] = {}
+    codes = [index.setdefault(category, len(index)) for category in categories]
+    
+    if len(codes) >= _VECTORIZE_MIN_ITEMS and _HAS_NUMBA:
+        # Compiled segmented sum straight over the integer cents
+        totals = _segment_sums(
+            np.asarray(codes, dtype=np.int64),
+            np.asarray(price_cents, dtype=np.int64),
+            len(index)
+        ).tolist()
+    elif len(codes) >= _VECTORIZE_MIN_ITEMS:
+        # Segmented sum over category codes in one vectorized pass; whole cents
+        # stay exact in float64 well beyond any grocery total
+        totals = np.bincount(
+            np.asarray(codes, dtype=np.intp),
+            weights=np.asarray(price_cents, dtype=np.float64),
+            minlength=len(index)
+        ).round().astype(np.int64).tolist()
+    else:
+        totals = [0] * len(index)
+        for code, cents in zip(codes, price_cents):
+            totals[code] += cents
+    
+    return dict(zip(index, totals))
+
+
 class GroceryListAgent(BaseAgent):
     """
     Grocery List Generator Agent responsible for:
@@ -20,27 +175,43 @@ class GroceryListAgent(BaseAgent):
     - Coordinating with Grocery Ordering Agent
     """
     
+    # Shared read-only tables; built once per class rather than per instance
+    GROCERY_CATEGORIES = MappingProxyType({
+        "proteins": ("meat", "fish", "poultry", "eggs", "tofu", "legumes"),
+        "vegetables": ("leafy_greens", "root_vegetables", "cruciferous", "nightshades"),
+        "fruits": ("berries", "citrus", "tropical", "stone_fruits"),
+        "grains": ("whole_grains", "pasta", "bread", "cereals"),
+        "dairy": ("milk", "yogurt", "cheese", "butter"),
+        "pantry": ("oils", "vinegars", "spices", "herbs", "condiments"),
+        "frozen": ("frozen_vegetables", "frozen_fruits", "frozen_meals")
+    })
+    
+    QUANTITY_ESTIMATES = MappingProxyType({
+        "proteins": MappingProxyType({"per_serving": 0.25, "unit": "pounds"}),
+        "vegetables": MappingProxyType({"per_serving": 0.5, "unit": "cups"}),
+        "fruits": MappingProxyType({"per_serving": 0.5, "unit": "pieces"}),
+        "grains": MappingProxyType({"per_serving": 0.5, "unit": "cups"}),
+        "dairy": MappingProxyType({"per_serving": 0.5, "unit": "cups"}),
+        "pantry": MappingProxyType({"per_serving": 0.1, "unit": "tablespoons"}),
+        "frozen": MappingProxyType({"per_serving": 0.5, "unit": "cups"})
+    })
+    
+    DEFAULT_QUANTITY_ESTIMATE = MappingProxyType({"per_serving": 0.5, "unit": "units"})
+    
     def __init__(self):
         super().__init__("GroceryListAgent")
-        self.grocery_categories = {
-            "proteins": ["meat", "fish", "poultry", "eggs", "tofu", "legumes"],
-            "vegetables": ["leafy_greens", "root_vegetables", "cruciferous", "nightshades"],
-            "fruits": ["berries", "citrus", "tropical", "stone_fruits"],
-            "grains": ["whole_grains", "pasta", "bread", "cereals"],
-            "dairy": ["milk", "yogurt", "cheese", "butter"],
-            "pantry": ["oils", "vinegars", "spices", "herbs", "condiments"],
-            "frozen": ["frozen_vegetables", "frozen_fruits", "frozen_meals"]
-        }
         
-        self.quantity_estimates = {
-            "proteins": {"per_serving": 0.25, "unit": "pounds"},
-            "vegetables": {"per_serving": 0.5, "unit": "cups"},
-            "fruits": {"per_serving": 0.5, "unit": "pieces"},
-            "grains": {"per_serving": 0.5, "unit": "cups"},
-            "dairy": {"per_serving": 0.5, "unit": "cups"},
-            "pantry": {"per_serving": 0.1, "unit": "tablespoons"},
-            "frozen": {"per_serving": 0.5, "unit": "cups"}
+        # Aisle order for shopping categories; unknown categories go last
+        self._category_priority = {
+            "proteins": 1,
+            "vegetables": 2,
+            "fruits": 3,
+            "dairy": 4,
+            "grains": 5,
+            "pantry": 6,
+            "frozen": 7
         }
+        self._category_order = sorted(self._category_priority, key=self._category_priority.get)
     
     async def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -64,26 +235,32 @@ class GroceryListAgent(BaseAgent):
             if not user_id:
                 raise ValueError("User ID is required for grocery list generation")
             
-            # Initialize MCP client if available
-            if user_id:
-                self.initialize_mcp_client(user_id)
+            # Per-request MCP client so concurrent users never share one
+            mcp = self.create_mcp_client(user_id)
             
             # Generate grocery list
             if grocery_data and meal_plan:
-                grocery_list = await self._generate_grocery_list(user_id, grocery_data, meal_plan)
+                grocery_list = await self._generate_grocery_list(user_id, grocery_data, meal_plan, mcp=mcp)
                 state["grocery_list"] = grocery_list
                 
                 # Organize by shopping categories
-                organized_list = await self._organize_grocery_list(grocery_list)
+                organized_list = self._organize_grocery_list(grocery_list)
                 state["organized_grocery_list"] = organized_list
                 
                 # Estimate costs
-                cost_estimate = await self._estimate_grocery_costs(grocery_list)
+                cost_estimate = self._estimate_grocery_costs(grocery_list, organized_list)
                 state["grocery_cost_estimate"] = cost_estimate
                 
                 # Prepare data for Grocery Ordering Agent
-                ordering_data = await self._prepare_ordering_data(grocery_list, organized_list, cost_estimate)
+                ordering_data = self._prepare_ordering_data(grocery_list, organized_list, cost_estimate)
                 state["ordering_data"] = ordering_data
+                
+                # Items stay typed while we work on them; state carries plain dicts
+                # and none of the working columns (a failed generation has neither)
+                if grocery_list:
+                    grocery_list["items"] = [item.to_dict() for item in grocery_list["items"]]
+                    grocery_list.pop("item_categories", None)
+                    grocery_list.pop("item_price_cents", None)
             
             await self.increment_success()
             return state
@@ -93,37 +270,54 @@ class GroceryListAgent(BaseAgent):
             state["grocery_list_error"] = error_response
             return state
     
-    async def _generate_grocery_list(self, user_id: str, grocery_data: Dict[str, Any], meal_plan: Dict[str, Any]) -> Dict[str, Any]:
+    async def _generate_grocery_list(self, user_id: str, grocery_data: Dict[str, Any], meal_plan: Dict[str, Any],
+                                     mcp: Optional[Any] = None) -> Dict[str, Any]:
         """Generate comprehensive grocery list from meal plan"""
         try:
             ingredients_summary = grocery_data.get("ingredients_summary", {})
             shopping_categories = grocery_data.get("shopping_categories", {})
+            now_ts = time.time()
             
             grocery_list = {
-                "list_id": f"grocery_{user_id}_{datetime.utcnow().timestamp()}",
+                "list_id": f"grocery_{user_id}_{now_ts}",
                 "user_id": user_id,
-                "created_at": datetime.utcnow().isoformat(),
+                "created_at": datetime.utcfromtimestamp(now_ts).isoformat(),
                 "meal_plan_duration": meal_plan.get("duration", "7 days"),
                 "total_items": 0,
                 "estimated_cost": 0.0,
-                "items": []
+                "items": [],
+                # Category and price columns parallel to items for the aggregation passes
+                "item_categories": [],
+                "item_price_cents": []
             }
             
+            # Start the store lookup first and yield once so its MCP request is
+            # sent before the item build, overlapping the round trip with it
+            store_task = None
+            if mcp:
+                try:
+                    store_task = asyncio.ensure_future(mcp.call_tool("find_grocery_stores", {"location": "user_location"}))
+                    await asyncio.sleep(0)
+                except Exception as e:
+                    logger.warning(f"Could not get store information: {str(e)}")
+            
             # Process ingredients by category
+            items = grocery_list["items"]
+            item_categories = grocery_list["item_categories"]
+            item_price_cents = grocery_list["item_price_cents"]
             for category, ingredients in shopping_categories.items():
                 for ingredient in ingredients:
-                    item = await self._create_grocery_item(
-                        ingredient, ingredients_summary.get(ingredient, 1), category
-                    )
-                    if item:
-                        grocery_list["items"].append(item)
-                        grocery_list["total_items"] += 1
+                    item = self._create_grocery_item(ingredient, ingredients_summary.get(ingredient, 1), category)
+                    items.append(item)
+                    item_categories.append(category)
+                    item_price_cents.append(_item_price_cents(ingredient, item.quantity))
+            grocery_list["total_items"] = len(items)
             
             # Use MCP tools for enhanced grocery planning if available
-            if self.mcp_client:
+            if store_task:
                 try:
                     # Get grocery store information
-                    store_info = await self.find_grocery_stores(location="user_location")
+                    store_info = await store_task
                     if store_info.get("success"):
                         grocery_list["store_recommendations"] = store_info.get("result", {})
                 except Exception as e:
@@ -136,162 +330,58 @@ class GroceryListAgent(BaseAgent):
             logger.error(f"Failed to generate grocery list for user {user_id}: {str(e)}")
             return {}
     
-    async def _create_grocery_item(self, ingredient: str, quantity_needed: int, category: str) -> Optional[Dict[str, Any]]:
+    def _create_grocery_item(self, ingredient: str, quantity_needed: int, category: str) -> GroceryItem:
         """Create a grocery item with quantity and pricing information"""
-        try:
-            # Determine quantity and unit
-            quantity_info = self._calculate_quantity(ingredient, quantity_needed, category)
-            
-            # Create item
-            item = {
-                "ingredient": ingredient,
-                "category": category,
-                "quantity": quantity_info["quantity"],
-                "unit": quantity_info["unit"],
-                "priority": self._determine_priority(category, ingredient),
-                "estimated_price": self._estimate_item_price(ingredient, quantity_info["quantity"]),
-                "notes": self._generate_item_notes(ingredient, category),
-                "alternatives": self._suggest_alternatives(ingredient, category)
-            }
-            
-            return item
-            
-        except Exception as e:
-            logger.error(f"Failed to create grocery item for {ingredient}: {str(e)}")
-            return None
+        # Determine quantity and unit
+        quantity_info = self._calculate_quantity(ingredient, quantity_needed, category)
+        
+        # Create item
+        return GroceryItem(
+            ingredient=ingredient,
+            category=category,
+            quantity=quantity_info["quantity"],
+            unit=quantity_info["unit"],
+            priority=self._determine_priority(category, ingredient),
+            estimated_price=self._estimate_item_price(ingredient, quantity_info["quantity"]),
+            notes=self._generate_item_notes(ingredient, category),
+            alternatives=self._suggest_alternatives(ingredient, category)
+        )
     
     def _calculate_quantity(self, ingredient: str, quantity_needed: int, category: str) -> Dict[str, Any]:
         """Calculate appropriate quantity for grocery item"""
+        # Get base quantity estimate for category
+        base_estimate = self.QUANTITY_ESTIMATES.get(category, self.DEFAULT_QUANTITY_ESTIMATE)
+        
         try:
-            # Get base quantity estimate for category
-            base_estimate = self.quantity_estimates.get(category, {"per_serving": 0.5, "unit": "units"})
-            
-            # Calculate total quantity needed
-            total_quantity = quantity_needed * base_estimate["per_serving"]
-            
-            # Round to reasonable amounts
-            if base_estimate["unit"] == "pounds":
-                total_quantity = round(total_quantity, 2)
-            elif base_estimate["unit"] == "cups":
-                total_quantity = round(total_quantity, 1)
-            else:
-                total_quantity = round(total_quantity)
-            
-            return {
-                "quantity": total_quantity,
-                "unit": base_estimate["unit"]
-            }
-            
-        except Exception as e:
+            quantity = _rounded_quantity(quantity_needed, base_estimate["per_serving"], base_estimate["unit"])
+        except (TypeError, ValueError) as e:
+            # A missing or non-numeric count (or an unhashable one) must not sink the whole list
             logger.error(f"Failed to calculate quantity for {ingredient}: {str(e)}")
             return {"quantity": 1, "unit": "units"}
+        
+        return {
+            "quantity": quantity,
+            "unit": base_estimate["unit"]
+        }
     
     def _determine_priority(self, category: str, ingredient: str) -> str:
         """Determine priority level for grocery item"""
-        try:
-            # High priority items
-            high_priority = ["milk", "bread", "eggs", "vegetables", "fruits"]
-            if ingredient in high_priority:
-                return "high"
-            
-            # Medium priority items
-            medium_priority = ["meat", "fish", "poultry", "grains"]
-            if ingredient in medium_priority:
-                return "medium"
-            
-            # Low priority items (can be substituted or skipped)
-            return "low"
-            
-        except Exception as e:
-            logger.error(f"Failed to determine priority for {ingredient}: {str(e)}")
-            return "medium"
+        # Low priority items can be substituted or skipped
+        return _INGREDIENT_PRIORITY.get(ingredient, "low")
     
     def _estimate_item_price(self, ingredient: str, quantity: float) -> float:
         """Estimate price for grocery item"""
-        try:
-            # Base price estimates (in USD)
-            base_prices = {
-                "milk": 4.50,
-                "bread": 3.00,
-                "eggs": 5.00,
-                "chicken": 8.00,
-                "vegetables": 2.50,
-                "fruits": 3.00,
-                "grains": 2.00,
-                "dairy": 4.00
-            }
-            
-            # Get base price for ingredient category
-            base_price = base_prices.get(ingredient, 3.00)
-            
-            # Adjust for quantity
-            estimated_price = base_price * quantity
-            
-            return round(estimated_price, 2)
-            
-        except Exception as e:
-            logger.error(f"Failed to estimate price for {ingredient}: {str(e)}")
-            return 3.00
+        return _item_price_cents(ingredient, quantity) / 100
     
     def _generate_item_notes(self, ingredient: str, category: str) -> str:
         """Generate helpful notes for grocery item"""
-        try:
-            notes = ""
-            
-            if category == "proteins":
-                if ingredient in ["chicken", "fish"]:
-                    notes = "Look for fresh, not frozen"
-                elif ingredient == "tofu":
-                    notes = "Check expiration date"
-            
-            elif category == "vegetables":
-                if ingredient in ["lettuce", "spinach"]:
-                    notes = "Choose crisp, vibrant leaves"
-                elif ingredient in ["tomatoes", "bell_peppers"]:
-                    notes = "Select firm, unblemished pieces"
-            
-            elif category == "fruits":
-                if ingredient in ["bananas", "avocados"]:
-                    notes = "Choose based on ripeness preference"
-                elif ingredient == "berries":
-                    notes = "Check for mold, avoid crushed packages"
-            
-            return notes
-            
-        except Exception as e:
-            logger.error(f"Failed to generate notes for {ingredient}: {str(e)}")
-            return ""
+        return _ITEM_NOTES.get((category, ingredient), "")
     
-    def _suggest_alternatives(self, ingredient: str, category: str) -> List[str]:
+    def _suggest_alternatives(self, ingredient: str, category: str) -> Tuple[str, ...]:
         """Suggest alternative ingredients"""
-        try:
-            alternatives = []
-            
-            if category == "proteins":
-                if ingredient == "chicken":
-                    alternatives = ["turkey", "pork", "beef"]
-                elif ingredient == "fish":
-                    alternatives = ["shrimp", "salmon", "tilapia"]
-            
-            elif category == "vegetables":
-                if ingredient == "broccoli":
-                    alternatives = ["cauliflower", "asparagus", "green_beans"]
-                elif ingredient == "spinach":
-                    alternatives = ["kale", "arugula", "mixed_greens"]
-            
-            elif category == "grains":
-                if ingredient == "quinoa":
-                    alternatives = ["rice", "couscous", "farro"]
-                elif ingredient == "oats":
-                    alternatives = ["granola", "cereal", "bread"]
-            
-            return alternatives
-            
-        except Exception as e:
-            logger.error(f"Failed to suggest alternatives for {ingredient}: {str(e)}")
-            return []
+        return _ITEM_ALTERNATIVES.get((category, ingredient), ())
     
-    async def _organize_grocery_list(self, grocery_list: Dict[str, Any]) -> Dict[str, Any]:
+    def _organize_grocery_list(self, grocery_list: Dict[str, Any]) -> Dict[str, Any]:
         """Organize grocery list by shopping categories"""
         try:
             organized_list = {
@@ -301,27 +391,33 @@ class GroceryListAgent(BaseAgent):
                 "categories": {}
             }
             
-            # Group items by category
-            for item in grocery_list.get("items", []):
-                category = item.get("category", "other")
-                
-                if category not in organized_list["categories"]:
-                    organized_list["categories"][category] = {
+            # Group items by category; each category references its items by their
+            # index in grocery_list["items"] so the item dicts are not duplicated
+            item_categories, item_price_cents = _item_columns(grocery_list)
+            categories = organized_list["categories"]
+            for index, category in enumerate(item_categories):
+                bucket = categories.get(category)
+                if bucket is None:
+                    bucket = categories[category] = {
                         "category_name": category,
-                        "items": [],
+                        "item_refs": [],
                         "total_items": 0,
                         "estimated_cost": 0.0
                     }
                 
-                organized_list["categories"][category]["items"].append(item)
-                organized_list["categories"][category]["total_items"] += 1
-                organized_list["categories"][category]["estimated_cost"] += item.get("estimated_price", 0)
+                bucket["item_refs"].append(index)
+            
+            # Count and total each category from the packed price column, in
+            # whole cents so the sums are exact
+            category_cents = _category_totals(item_categories, item_price_cents)
+            for category, bucket in categories.items():
+                bucket["total_items"] = len(bucket["item_refs"])
+                bucket["estimated_cost"] = category_cents[category] / 100
             
-            # Sort categories by priority
-            organized_list["categories"] = dict(sorted(
-                organized_list["categories"].items(),
-                key=lambda x: self._get_category_priority(x[0])
-            ))
+            # Order categories by priority, unknown ones last in the order they were seen
+            ordered = {category: categories[category] for category in self._category_order if category in categories}
+            ordered.update(categories)
+            organized_list["categories"] = ordered
             
             return organized_list
             
@@ -331,42 +427,36 @@ class GroceryListAgent(BaseAgent):
     
     def _get_category_priority(self, category: str) -> int:
         """Get priority order for shopping categories"""
-        try:
-            priority_order = {
-                "proteins": 1,
-                "vegetables": 2,
-                "fruits": 3,
-                "dairy": 4,
-                "grains": 5,
-                "pantry": 6,
-                "frozen": 7
-            }
-            
-            return priority_order.get(category, 8)
-            
-        except Exception as e:
-            logger.error(f"Failed to get category priority for {category}: {str(e)}")
-            return 8
+        return self._category_priority.get(category, 8)
     
-    async def _estimate_grocery_costs(self, grocery_list: Dict[str, Any]) -> Dict[str, Any]:
+    def _estimate_grocery_costs(self, grocery_list: Dict[str, Any],
+                                organized_list: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Estimate total grocery costs"""
         try:
             items = grocery_list.get("items", [])
+            item_categories, item_price_cents = _item_columns(grocery_list)
+            
+            if organized_list and organized_list.get("categories"):
+                # Reuse the per-category totals summed while organizing the list
+                category_costs = {
+                    category: bucket["estimated_cost"]
+                    for category, bucket in organized_list["categories"].items()
+                }
+            else:
+                # Calculate costs by category
+                category_costs = {
+                    category: cents / 100
+                    for category, cents in _category_totals(item_categories, item_price_cents).items()
+                }
             
-            total_cost = sum(item.get("estimated_price", 0) for item in items)
-            category_costs = {}
-            
-            # Calculate costs by category
-            for item in items:
-                category = item.get("category", "other")
-                if category not in category_costs:
-                    category_costs[category] = 0
-                category_costs[category] += item.get("estimated_price", 0)
+            # Whole-cent total, converted to dollars only for the estimate
+            total_cents = sum(item_price_cents)
+            total_cost = total_cents / 100
             
             cost_estimate = {
-                "total_estimated_cost": round(total_cost, 2),
+                "total_estimated_cost": total_cost,
                 "cost_by_category": category_costs,
-                "average_item_cost": round(total_cost / len(items), 2) if items else 0,
+                "average_item_cost": round(total_cents / len(items) / 100, 2) if items else 0,
                 "budget_recommendations": self._generate_budget_recommendations(total_cost)
             }
             
@@ -378,28 +468,23 @@ class GroceryListAgent(BaseAgent):
     
     def _generate_budget_recommendations(self, total_cost: float) -> List[str]:
         """Generate budget-saving recommendations"""
-        try:
-            recommendations = []
-            
-            if total_cost > 100:
-                recommendations.append("Consider buying in bulk for frequently used items")
-                recommendations.append("Look for store brand alternatives")
-                recommendations.append("Plan meals around seasonal produce")
-            
-            elif total_cost > 75:
-                recommendations.append("Check for coupons and sales")
-                recommendations.append("Consider meal prep to reduce waste")
-            
-            else:
-                recommendations.append("Great budget planning! Keep up the good work")
-            
-            return recommendations
-            
-        except Exception as e:
-            logger.error(f"Failed to generate budget recommendations: {str(e)}")
-            return []
+        recommendations = []
+        
+        if total_cost > 100:
+            recommendations.append("Consider buying in bulk for frequently used items")
+            recommendations.append("Look for store brand alternatives")
+            recommendations.append("Plan meals around seasonal produce")
+        
+        elif total_cost > 75:
+            recommendations.append("Check for coupons and sales")
+            recommendations.append("Consider meal prep to reduce waste")
+        
+        else:
+            recommendations.append("Great budget planning! Keep up the good work")
+        
+        return recommendations
     
-    async def _prepare_ordering_data(self, grocery_list: Dict[str, Any], organized_list: Dict[str, Any], cost_estimate: Dict[str, Any]) -> Dict[str, Any]:
+    def _prepare_ordering_data(self, grocery_list: Dict[str, Any], organized_list: Dict[str, Any], cost_estimate: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare data for Grocery Ordering Agent"""
         try:
             ordering_data = {
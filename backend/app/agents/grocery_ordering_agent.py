@@ -3,14 +3,136 @@ Grocery Ordering Agent - Manages grocery ordering and delivery
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
 from datetime import datetime, timedelta
+from dataclasses import dataclass, fields
+from contextvars import ContextVar
 import asyncio
+import time
+from types import MappingProxyType
 
 from app.agents.base_agent import BaseAgent
 
 logger = logging.getLogger(__name__)
 
+_DELIVERY_SERVICES = ("zepto", "blinkit", "instamart", "dunzo")
+_ORDER_STATUSES = ("pending", "confirmed", "preparing", "out_for_delivery", "delivered", "cancelled")
+_PAYMENT_METHODS = ("card", "upi", "net_banking", "wallet", "cod")
+
+# Mock delivery service data
+_DELIVERY_SERVICE_INFO = MappingProxyType({
+    "zepto": MappingProxyType({"delivery_time": "10 minutes", "min_order": 99, "delivery_fee": 0}),
+    "blinkit": MappingProxyType({"delivery_time": "10 minutes", "min_order": 99, "delivery_fee": 0}),
+    "instamart": MappingProxyType({"delivery_time": "15 minutes", "min_order": 149, "delivery_fee": 20}),
+    "dunzo": MappingProxyType({"delivery_time": "20 minutes", "min_order": 199, "delivery_fee": 30})
+})
+
+# Flat per-service tables for delivery service selection, with delivery
+# time parsed to whole minutes
+_SERVICE_MINUTES = MappingProxyType({
+    service: int(info["delivery_time"].split()[0]) for service, info in _DELIVERY_SERVICE_INFO.items()
+})
+_SERVICE_MIN_ORDER = MappingProxyType({service: info["min_order"] for service, info in _DELIVERY_SERVICE_INFO.items()})
+_SERVICE_FEE = MappingProxyType({service: info["delivery_fee"] for service, info in _DELIVERY_SERVICE_INFO.items()})
+
+# Service listing served by get_delivery_services; callers get copies of the entries
+_DELIVERY_SERVICE_LISTING = tuple(
+    {
+        "service_name": service.title(),
+        "delivery_time": info["delivery_time"],
+        "minimum_order": info["min_order"],
+        "delivery_fee": info["delivery_fee"],
+        "available": True
+    }
+    for service, info in _DELIVERY_SERVICE_INFO.items()
+)
+
+# Fixed delivery stages and confirmation steps, shared by every order; each
+# order gets its own copies of the stage dicts
+_DELIVERY_TIMELINE = (
+    {
+        "stage": "order_confirmed",
+        "estimated_time": "0 minutes",
+        "description": "Order received and confirmed"
+    },
+    {
+        "stage": "preparing",
+        "estimated_time": "5 minutes",
+        "description": "Items being prepared and packed"
+    },
+    {
+        "stage": "out_for_delivery",
+        "estimated_time": "10 minutes",
+        "description": "Order out for delivery"
+    },
+    {
+        "stage": "delivered",
+        "estimated_time": "10-15 minutes",
+        "description": "Order delivered to your doorstep"
+    }
+)
+
+_ORDER_NEXT_STEPS = (
+    "Order confirmed and being prepared",
+    "You'll receive updates on preparation and delivery",
+    "Track your order using the tracking ID"
+)
+
+
+@dataclass(slots=True)
+class GroceryOrder:
+    """A grocery order placed with a delivery service"""
+    order_id: str
+    user_id: str
+    created_at: str
+    delivery_service: str
+    items: List[Dict[str, Any]]
+    total_items: int
+    subtotal: float
+    delivery_fee: float
+    total_amount: float
+    status: str
+    estimated_delivery: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict form used when the order is written to agent state"""
+        return {name: getattr(self, name) for name in _GROCERY_ORDER_FIELDS}
+
+
+_GROCERY_ORDER_FIELDS = tuple(f.name for f in fields(GroceryOrder))
+
+
+@dataclass(frozen=True, slots=True)
+class _OrderClock:
+    """Timestamps and ID suffix shared by every record of one order"""
+    now_iso: str
+    eta_iso: str
+    id_suffix: str
+
+    @classmethod
+    def capture(cls) -> "_OrderClock":
+        """Read the clock once and format everything the order records need"""
+        now = datetime.utcnow()
+        return cls(
+            now_iso=now.isoformat(),
+            eta_iso=(now + timedelta(minutes=10)).isoformat(),
+            # Integer nanoseconds in hex: no float formatting and no collisions
+            # between orders placed within the same microsecond
+            id_suffix=f"{time.time_ns():x}"
+        )
+
+
+# Clock of the order being processed; set per process() call, so tasks running
+# orders concurrently each see their own
+_ORDER_CLOCK: ContextVar[_OrderClock] = ContextVar("grocery_order_clock")
+
+
+def _order_clock() -> _OrderClock:
+    """Clock of the current order, or a fresh reading when called outside process()"""
+    clock = _ORDER_CLOCK.get(None)
+    return clock if clock is not None else _OrderClock.capture()
+
+
 class GroceryOrderingAgent(BaseAgent):
     """
     Grocery Ordering Agent responsible for:
@@ -20,21 +142,16 @@ class GroceryOrderingAgent(BaseAgent):
     - Tracking delivery status
     """
     
+    # Shared read-only tables; built once at import rather than per instance
+    delivery_services = _DELIVERY_SERVICES
+    order_statuses = _ORDER_STATUSES
+    payment_methods = _PAYMENT_METHODS
+    delivery_service_info = _DELIVERY_SERVICE_INFO
+    
     def __init__(self):
         super().__init__("GroceryOrderingAgent")
-        self.delivery_services = ["zepto", "blinkit", "instamart", "dunzo"]
-        self.order_statuses = ["pending", "confirmed", "preparing", "out_for_delivery", "delivered", "cancelled"]
-        self.payment_methods = ["card", "upi", "net_banking", "wallet", "cod"]
-        
-        # Mock delivery service data
-        self.delivery_service_info = {
-            "zepto": {"delivery_time": "10 minutes", "min_order": 99, "delivery_fee": 0},
-            "blinkit": {"delivery_time": "10 minutes", "min_order": 99, "delivery_fee": 0},
-            "instamart": {"delivery_time": "15 minutes", "min_order": 149, "delivery_fee": 20},
-            "dunzo": {"delivery_time": "20 minutes", "min_order": 199, "delivery_fee": 30}
-        }
     
-    async def process(self, state: Dict[str, Any]) -> Dict[str, Any]):
+    async def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Main processing method for grocery ordering
         
@@ -45,10 +162,15 @@ class GroceryOrderingAgent(BaseAgent):
             Updated state with order details and confirmation
         """
         try:
+            # Nothing to order: skip the status, MCP and counter bookkeeping and
+            # leave the state untouched
+            ordering_data = state.get("ordering_data")
+            if not (ordering_data and ordering_data.get("ordering_ready")):
+                return state
+            
             await self.update_status("processing")
             
             # Extract ordering data
-            ordering_data = state.get("ordering_data", {})
             user_data = state.get("user_data", {})
             user_id = user_data.get("user_id")
             
@@ -56,23 +178,25 @@ class GroceryOrderingAgent(BaseAgent):
                 raise ValueError("User ID is required for grocery ordering")
             
             # Initialize MCP client if available
-            if user_id:
-                self.initialize_mcp_client(user_id)
+            self.initialize_mcp_client(user_id)
             
-            # Process grocery order
-            if ordering_data and ordering_data.get("ordering_ready"):
+            # One clock reading for every timestamp and ID in this order
+            clock_token = _ORDER_CLOCK.set(_OrderClock.capture())
+            try:
+                # Process grocery order
                 order_result = await self._process_grocery_order(user_id, ordering_data, user_data)
-                state["grocery_order"] = order_result
+                updates = {"grocery_order": order_result}
                 
                 # Generate order confirmation
                 if order_result.get("order_created"):
-                    confirmation = await self._generate_order_confirmation(order_result)
-                    state["order_confirmation"] = confirmation
+                    updates["order_confirmation"] = self._generate_order_confirmation(order_result)
                     
                     # Prepare delivery tracking
-                    tracking_info = await self._prepare_delivery_tracking(order_result)
-                    state["delivery_tracking"] = tracking_info
+                    updates["delivery_tracking"] = self._prepare_delivery_tracking(order_result)
+            finally:
+                _ORDER_CLOCK.reset(clock_token)
             
+            state.update(updates)
             await self.increment_success()
             return state
             
@@ -83,27 +207,34 @@ class GroceryOrderingAgent(BaseAgent):
     
     async def _process_grocery_order(self, user_id: str, ordering_data: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process the grocery order"""
+        service_task = None
         try:
             grocery_list = ordering_data.get("grocery_list", {})
             cost_estimate = ordering_data.get("cost_estimate", {})
             
+            # Start the MCP service lookup first and yield once so its request is
+            # sent before the order is built, overlapping the round trip with it
+            if self.mcp_client:
+                service_task = asyncio.ensure_future(self._get_service_recommendations())
+                await asyncio.sleep(0)
+            
             # Select delivery service
-            selected_service = await self._select_delivery_service(ordering_data, user_data)
+            selected_service = self._select_delivery_service(ordering_data, user_data)
             
             # Create order
-            order = await self._create_order(user_id, grocery_list, cost_estimate, selected_service)
+            order = self._create_order(user_id, grocery_list, cost_estimate, selected_service)
             
             # Process payment
-            payment_result = await self._process_payment(order, user_data)
+            payment_result = self._process_payment(order, user_data)
             
             # Send order to delivery service
-            delivery_result = await self._send_order_to_service(order, selected_service)
+            delivery_result = self._send_order_to_service(order, selected_service)
             
             order_result = {
-                "order_id": order.get("order_id"),
+                "order_id": order.order_id,
                 "user_id": user_id,
                 "order_created": True,
-                "order_details": order,
+                "order_details": order.to_dict(),
                 "delivery_service": selected_service,
                 "payment_status": payment_result.get("status"),
                 "delivery_status": delivery_result.get("status"),
@@ -112,236 +243,181 @@ class GroceryOrderingAgent(BaseAgent):
             }
             
             # Use MCP tools for enhanced ordering if available
-            if self.mcp_client:
+            if service_task:
                 try:
                     # Get delivery service recommendations
-                    service_recs = await self.find_grocery_stores(location="user_location")
+                    service_recs = await service_task
                     if service_recs.get("success"):
                         order_result["service_recommendations"] = service_recs.get("result", {})
                 except Exception as e:
-                    logger.warning(f"Could not get service recommendations: {str(e)}")
+                    logger.warning("Could not get service recommendations: %s", e)
             
-            logger.info(f"Processed grocery order {order.get('order_id')} for user {user_id}")
+            logger.info("Processed grocery order %s for user %s", order.order_id, user_id)
             return order_result
             
         except Exception as e:
-            logger.error(f"Failed to process grocery order for user {user_id}: {str(e)}")
+            logger.error("Failed to process grocery order for user %s: %s", user_id, e)
+            if service_task:
+                service_task.cancel()
             return {"order_created": False, "error": str(e)}
     
-    async def _select_delivery_service(self, ordering_data: Dict[str, Any], user_data: Dict[str, Any]) -> str:
+    async def _get_service_recommendations(self) -> Dict[str, Any]:
+        """Get delivery service recommendations through MCP"""
+        return await self.use_mcp_tool("find_grocery_stores", {"location": "user_location"})
+    
+    def _select_delivery_service(self, ordering_data: Dict[str, Any], user_data: Dict[str, Any]) -> str:
         """Select the best delivery service for the order"""
         try:
-            grocery_list = ordering_data.get("grocery_list", {})
             cost_estimate = ordering_data.get("cost_estimate", {})
-            total_cost = cost_estimate.get("total_estimated_cost", 0)
+            total_cost: float = cost_estimate.get("total_estimated_cost", 0)
             
             # Filter services based on order requirements
-            available_services = []
-            
-            for service, info in self.delivery_service_info.items():
-                if total_cost >= info["min_order"]:
-                    available_services.append({
-                        "service": service,
-                        "delivery_time": info["delivery_time"],
-                        "delivery_fee": info["delivery_fee"],
-                        "total_cost": total_cost + info["delivery_fee"]
-                    })
+            available_services: List[str] = [
+                service for service, min_order in _SERVICE_MIN_ORDER.items() if total_cost >= min_order
+            ]
             
             if not available_services:
                 # If no service meets minimum order, select the one with lowest minimum
-                available_services = [{
-                    "service": "zepto",
-                    "delivery_time": "10 minutes",
-                    "delivery_fee": 0,
-                    "total_cost": total_cost
-                }]
+                available_services = ["zepto"]
             
             # Select service based on user preferences
-            user_preference = user_data.get("preferred_delivery_service", "zepto")
+            user_preference: str = user_data.get("preferred_delivery_service", "zepto")
             
             # Check if user preference is available
-            for service_info in available_services:
-                if service_info["service"] == user_preference:
-                    return user_preference
+            if user_preference in available_services:
+                return user_preference
             
             # If user preference not available, select fastest delivery
-            fastest_service = min(available_services, key=lambda x: int(x["delivery_time"].split()[0]))
-            return fastest_service["service"]
+            return min(available_services, key=_SERVICE_MINUTES.__getitem__)
             
         except Exception as e:
-            logger.error(f"Failed to select delivery service: {str(e)}")
+            logger.error("Failed to select delivery service: %s", e)
             return "zepto"
     
-    async def _create_order(self, user_id: str, grocery_list: Dict[str, Any], cost_estimate: Dict[str, Any], delivery_service: str) -> Dict[str, Any]:
+    def _create_order(self, user_id: str, grocery_list: Dict[str, Any], cost_estimate: Dict[str, Any], delivery_service: str) -> GroceryOrder:
         """Create the grocery order"""
-        try:
-            order = {
-                "order_id": f"order_{user_id}_{datetime.utcnow().timestamp()}",
-                "user_id": user_id,
-                "created_at": datetime.utcnow().isoformat(),
-                "delivery_service": delivery_service,
-                "items": grocery_list.get("items", []),
-                "total_items": grocery_list.get("total_items", 0),
-                "subtotal": cost_estimate.get("total_estimated_cost", 0),
-                "delivery_fee": self.delivery_service_info.get(delivery_service, {}).get("delivery_fee", 0),
-                "total_amount": cost_estimate.get("total_estimated_cost", 0) + 
-                              self.delivery_service_info.get(delivery_service, {}).get("delivery_fee", 0),
-                "status": "pending",
-                "estimated_delivery": (datetime.utcnow() + timedelta(minutes=10)).isoformat()
-            }
-            
-            return order
-            
-        except Exception as e:
-            logger.error(f"Failed to create order: {str(e)}")
-            return {}
+        clock = _order_clock()
+        subtotal: float = cost_estimate.get("total_estimated_cost", 0)
+        delivery_fee: float = _SERVICE_FEE.get(delivery_service, 0)
+        
+        return GroceryOrder(
+            order_id=f"order_{user_id}_{clock.id_suffix}",
+            user_id=user_id,
+            created_at=clock.now_iso,
+            delivery_service=delivery_service,
+            items=grocery_list.get("items", []),
+            total_items=grocery_list.get("total_items", 0),
+            subtotal=subtotal,
+            delivery_fee=delivery_fee,
+            total_amount=subtotal + delivery_fee,
+            status="pending",
+            estimated_delivery=clock.eta_iso
+        )
     
-    async def _process_payment(self, order: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_payment(self, order: GroceryOrder, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process payment for the order"""
-        try:
-            # Mock payment processing
-            payment_result = {
-                "payment_id": f"payment_{order.get('order_id')}",
-                "amount": order.get("total_amount", 0),
-                "currency": "INR",
-                "method": user_data.get("payment_method", "card"),
-                "status": "success",
-                "transaction_id": f"txn_{datetime.utcnow().timestamp()}",
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
-            return payment_result
-            
-        except Exception as e:
-            logger.error(f"Failed to process payment: {str(e)}")
-            return {"status": "failed", "error": str(e)}
+        clock = _order_clock()
+        # Mock payment processing
+        payment_result = {
+            "payment_id": f"payment_{order.order_id}",
+            "amount": order.total_amount,
+            "currency": "INR",
+            "method": user_data.get("payment_method", "card"),
+            "status": "success",
+            "transaction_id": f"txn_{clock.id_suffix}",
+            "timestamp": clock.now_iso
+        }
+        
+        return payment_result
     
-    async def _send_order_to_service(self, order: Dict[str, Any], delivery_service: str) -> Dict[str, Any]:
+    def _send_order_to_service(self, order: GroceryOrder, delivery_service: str) -> Dict[str, Any]:
         """Send order to the selected delivery service"""
-        try:
-            # Mock delivery service integration
-            delivery_result = {
-                "service_order_id": f"{delivery_service}_{order.get('order_id')}",
-                "status": "confirmed",
-                "estimated_delivery": order.get("estimated_delivery"),
-                "tracking_id": f"track_{delivery_service}_{datetime.utcnow().timestamp()}",
-                "delivery_partner": f"{delivery_service}_partner",
-                "special_instructions": "Handle with care, check expiration dates"
-            }
-            
-            return delivery_result
-            
-        except Exception as e:
-            logger.error(f"Failed to send order to service: {str(e)}")
-            return {"status": "failed", "error": str(e)}
+        # Mock delivery service integration
+        delivery_result = {
+            "service_order_id": f"{delivery_service}_{order.order_id}",
+            "status": "confirmed",
+            "estimated_delivery": order.estimated_delivery,
+            "tracking_id": f"track_{delivery_service}_{_order_clock().id_suffix}",
+            "delivery_partner": f"{delivery_service}_partner",
+            "special_instructions": "Handle with care, check expiration dates"
+        }
+        
+        return delivery_result
     
-    async def _generate_order_confirmation(self, order_result: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_order_confirmation(self, order_result: Dict[str, Any]) -> Dict[str, Any]:
         """Generate order confirmation for the user"""
-        try:
-            order_details = order_result.get("order_details", {})
-            delivery_service = order_result.get("delivery_service", "")
-            
-            confirmation = {
-                "order_id": order_details.get("order_id"),
-                "confirmation_number": f"CONF-{order_details.get('order_id')[-8:]}",
-                "timestamp": datetime.utcnow().isoformat(),
-                "delivery_service": delivery_service,
-                "estimated_delivery": order_result.get("estimated_delivery"),
-                "order_summary": {
-                    "total_items": order_details.get("total_items", 0),
-                    "subtotal": order_details.get("subtotal", 0),
-                    "delivery_fee": order_details.get("delivery_fee", 0),
-                    "total_amount": order_details.get("total_amount", 0)
-                },
-                "delivery_address": "user_delivery_address",
-                "contact_number": "user_contact_number",
-                "tracking_id": order_result.get("tracking_id"),
-                "next_steps": [
-                    "Order confirmed and being prepared",
-                    "You'll receive updates on preparation and delivery",
-                    "Track your order using the tracking ID"
-                ]
-            }
-            
-            return confirmation
-            
-        except Exception as e:
-            logger.error(f"Failed to generate order confirmation: {str(e)}")
-            return {}
+        order_details = order_result.get("order_details", {})
+        delivery_service = order_result.get("delivery_service", "")
+        order_id: str = order_details.get("order_id")
+        
+        confirmation = {
+            "order_id": order_id,
+            "confirmation_number": f"CONF-{order_id[-8:]}",
+            "timestamp": _order_clock().now_iso,
+            "delivery_service": delivery_service,
+            "estimated_delivery": order_result.get("estimated_delivery"),
+            "order_summary": {
+                "total_items": order_details.get("total_items", 0),
+                "subtotal": order_details.get("subtotal", 0),
+                "delivery_fee": order_details.get("delivery_fee", 0),
+                "total_amount": order_details.get("total_amount", 0)
+            },
+            "delivery_address": "user_delivery_address",
+            "contact_number": "user_contact_number",
+            "tracking_id": order_result.get("tracking_id"),
+            "next_steps": list(_ORDER_NEXT_STEPS)
+        }
+        
+        return confirmation
     
-    async def _prepare_delivery_tracking(self, order_result: Dict[str, Any]) -> Dict[str, Any]:
+    def _prepare_delivery_tracking(self, order_result: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare delivery tracking information"""
-        try:
-            tracking_info = {
-                "order_id": order_result.get("order_id"),
-                "tracking_id": order_result.get("tracking_id"),
-                "delivery_service": order_result.get("delivery_service"),
-                "current_status": order_result.get("delivery_status"),
-                "estimated_delivery": order_result.get("estimated_delivery"),
-                "status_updates": [
-                    {
-                        "status": "order_confirmed",
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "description": "Order confirmed and sent to delivery service"
-                    }
-                ],
-                "delivery_timeline": [
-                    {
-                        "stage": "order_confirmed",
-                        "estimated_time": "0 minutes",
-                        "description": "Order received and confirmed"
-                    },
-                    {
-                        "stage": "preparing",
-                        "estimated_time": "5 minutes",
-                        "description": "Items being prepared and packed"
-                    },
-                    {
-                        "stage": "out_for_delivery",
-                        "estimated_time": "10 minutes",
-                        "description": "Order out for delivery"
-                    },
-                    {
-                        "stage": "delivered",
-                        "estimated_time": "10-15 minutes",
-                        "description": "Order delivered to your doorstep"
-                    }
-                ]
-            }
-            
-            return tracking_info
-            
-        except Exception as e:
-            logger.error(f"Failed to prepare delivery tracking: {str(e)}")
-            return {}
+        tracking_info = {
+            "order_id": order_result.get("order_id"),
+            "tracking_id": order_result.get("tracking_id"),
+            "delivery_service": order_result.get("delivery_service"),
+            "current_status": order_result.get("delivery_status"),
+            "estimated_delivery": order_result.get("estimated_delivery"),
+            "status_updates": [
+                {
+                    "status": "order_confirmed",
+                    "timestamp": _order_clock().now_iso,
+                    "description": "Order confirmed and sent to delivery service"
+                }
+            ],
+            "delivery_timeline": [dict(stage) for stage in _DELIVERY_TIMELINE]
+        }
+        
+        return tracking_info
     
     async def track_delivery(self, tracking_id: str) -> Dict[str, Any]:
         """Track delivery status"""
         try:
             # Mock delivery tracking
             # In production, this would integrate with delivery service APIs
+            now = datetime.utcnow()
             
             tracking_status = {
                 "tracking_id": tracking_id,
                 "current_status": "out_for_delivery",
-                "last_update": datetime.utcnow().isoformat(),
-                "estimated_delivery": (datetime.utcnow() + timedelta(minutes=5)).isoformat(),
+                "last_update": now.isoformat(),
+                "estimated_delivery": (now + timedelta(minutes=5)).isoformat(),
                 "delivery_partner": "delivery_partner_name",
                 "location": "Near delivery location",
                 "status_history": [
                     {
                         "status": "order_confirmed",
-                        "timestamp": (datetime.utcnow() - timedelta(minutes=10)).isoformat(),
+                        "timestamp": (now - timedelta(minutes=10)).isoformat(),
                         "description": "Order confirmed"
                     },
                     {
                         "status": "preparing",
-                        "timestamp": (datetime.utcnow() - timedelta(minutes=8)).isoformat(),
+                        "timestamp": (now - timedelta(minutes=8)).isoformat(),
                         "description": "Items being prepared"
                     },
                     {
                         "status": "out_for_delivery",
-                        "timestamp": (datetime.utcnow() - timedelta(minutes=3)).isoformat(),
+                        "timestamp": (now - timedelta(minutes=3)).isoformat(),
                         "description": "Order out for delivery"
                     }
                 ]
@@ -350,109 +426,82 @@ class GroceryOrderingAgent(BaseAgent):
             return tracking_status
             
         except Exception as e:
-            logger.error(f"Failed to track delivery: {str(e)}")
+            logger.error("Failed to track delivery: %s", e)
             return {}
     
     async def cancel_order(self, order_id: str, user_id: str) -> Dict[str, Any]:
         """Cancel a grocery order"""
-        try:
-            # Mock order cancellation
-            cancellation_result = {
-                "order_id": order_id,
-                "user_id": user_id,
-                "cancelled_at": datetime.utcnow().isoformat(),
-                "status": "cancelled",
-                "refund_status": "processing",
-                "refund_amount": 0,  # Would be calculated based on order status
-                "cancellation_reason": "user_requested",
-                "message": "Order cancelled successfully. Refund will be processed within 3-5 business days."
-            }
-            
-            return cancellation_result
-            
-        except Exception as e:
-            logger.error(f"Failed to cancel order: {str(e)}")
-            return {"status": "failed", "error": str(e)}
+        # Mock order cancellation
+        cancellation_result = {
+            "order_id": order_id,
+            "user_id": user_id,
+            "cancelled_at": datetime.utcnow().isoformat(),
+            "status": "cancelled",
+            "refund_status": "processing",
+            "refund_amount": 0,  # Would be calculated based on order status
+            "cancellation_reason": "user_requested",
+            "message": "Order cancelled successfully. Refund will be processed within 3-5 business days."
+        }
+        
+        return cancellation_result
     
-    async def get_order_history(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get order history for a user"""
+    async def get_order_history(self, user_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream order history for a user, one order at a time"""
         try:
-            # Mock order history
-            # In production, this would retrieve from database
-            
-            order_history = [
-                {
-                    "order_id": f"order_{user_id}_1",
-                    "date": (datetime.utcnow() - timedelta(days=7)).isoformat(),
-                    "status": "delivered",
-                    "total_amount": 450.00,
-                    "delivery_service": "zepto"
-                },
-                {
-                    "order_id": f"order_{user_id}_2",
-                    "date": (datetime.utcnow() - timedelta(days=14)).isoformat(),
-                    "status": "delivered",
-                    "total_amount": 320.00,
-                    "delivery_service": "blinkit"
-                }
-            ]
-            
-            return order_history
-            
+            async for order in self._fetch_order_history(user_id):
+                yield order
         except Exception as e:
-            logger.error(f"Failed to get order history for user {user_id}: {str(e)}")
-            return []
+            logger.error("Failed to get order history for user %s: %s", user_id, e)
+    
+    async def _fetch_order_history(self, user_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Fetch past orders for a user"""
+        # Mock order history
+        # In production, this would stream rows from a database cursor
+        now = datetime.utcnow()
+        
+        yield {
+            "order_id": f"order_{user_id}_1",
+            "date": (now - timedelta(days=7)).isoformat(),
+            "status": "delivered",
+            "total_amount": 450.00,
+            "delivery_service": "zepto"
+        }
+        yield {
+            "order_id": f"order_{user_id}_2",
+            "date": (now - timedelta(days=14)).isoformat(),
+            "status": "delivered",
+            "total_amount": 320.00,
+            "delivery_service": "blinkit"
+        }
     
     async def get_delivery_services(self, location: str) -> List[Dict[str, Any]]:
         """Get available delivery services for a location"""
-        try:
-            available_services = []
-            
-            for service, info in self.delivery_service_info.items():
-                available_services.append({
-                    "service_name": service.title(),
-                    "delivery_time": info["delivery_time"],
-                    "minimum_order": info["min_order"],
-                    "delivery_fee": info["delivery_fee"],
-                    "available": True
-                })
-            
-            return available_services
-            
-        except Exception as e:
-            logger.error(f"Failed to get delivery services: {str(e)}")
-            return []
+        # Every service currently delivers everywhere, so location does not
+        # change the listing
+        return [dict(entry) for entry in _DELIVERY_SERVICE_LISTING]
     
     async def get_order_details(self, order_id: str) -> Dict[str, Any]:
         """Get detailed information about an order"""
-        try:
-            # Mock order details
-            # In production, this would retrieve from database
-            
-            order_details = {
-                "order_id": order_id,
-                "user_id": "user_123",
-                "created_at": datetime.utcnow().isoformat(),
-                "delivery_service": "zepto",
-                "items": [
-                    {"name": "Milk", "quantity": 1, "price": 45.00},
-                    {"name": "Bread", "quantity": 1, "price": 35.00},
-                    {"name": "Eggs", "quantity": 1, "price": 60.00}
-                ],
-                "total_items": 3,
-                "subtotal": 140.00,
-                "delivery_fee": 0.00,
-                "total_amount": 140.00,
-                "status": "confirmed",
-                "estimated_delivery": (datetime.utcnow() + timedelta(minutes=10)).isoformat()
-            }
-            
-            return order_details
-            
-        except Exception as e:
-            logger.error(f"Failed to get order details for {order_id}: {str(e)}")
-            return {}
-
-
-
-
+        # Mock order details
+        # In production, this would retrieve from database
+        now = datetime.utcnow()
+        
+        order_details = {
+            "order_id": order_id,
+            "user_id": "user_123",
+            "created_at": now.isoformat(),
+            "delivery_service": "zepto",
+            "items": [
+                {"name": "Milk", "quantity": 1, "price": 45.00},
+                {"name": "Bread", "quantity": 1, "price": 35.00},
+                {"name": "Eggs", "quantity": 1, "price": 60.00}
+            ],
+            "total_items": 3,
+            "subtotal": 140.00,
+            "delivery_fee": 0.00,
+            "total_amount": 140.00,
+            "status": "confirmed",
+            "estimated_delivery": (now + timedelta(minutes=10)).isoformat()
+        }
+        
+        return order_details
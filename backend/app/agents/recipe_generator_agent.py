@@ -3,14 +3,86 @@ Recipe Generator Agent - Generates recipes based on diet plans
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+from collections import Counter
+from itertools import chain, count
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from types import MappingProxyType
 import asyncio
+import time
+
+import numpy as np
 
 from app.agents.base_agent import BaseAgent
 
 logger = logging.getLogger(__name__)
 
+# Ingredients that rule a template out for each dietary restriction
+_RESTRICTION_BANS = MappingProxyType({
+    "dairy_free": frozenset({"milk", "yogurt", "cheese"}),
+    "gluten_free": frozenset({"bread", "pasta", "flour"}),
+})
+_RESTRICTION_BITS = MappingProxyType({restriction: 1 << bit for bit, restriction in enumerate(_RESTRICTION_BANS)})
+
+# Cooking steps keyed by a token of the template name; the first matching token wins
+_INSTRUCTION_TABLE = MappingProxyType({
+    "oatmeal": (
+        "Bring milk to a gentle boil in a saucepan",
+        "Add oats and reduce heat to low",
+        "Cook for 5-7 minutes, stirring occasionally",
+        "Add honey and optional toppings",
+        "Serve hot",
+    ),
+    "smoothie": (
+        "Add frozen fruits to blender",
+        "Pour in yogurt and milk",
+        "Blend until smooth",
+        "Pour into bowl and add toppings",
+        "Serve immediately",
+    ),
+    "salad": (
+        "Cook quinoa according to package instructions",
+        "Chop vegetables and prepare protein",
+        "Combine all ingredients in a large bowl",
+        "Add dressing and toss gently",
+        "Serve chilled or at room temperature",
+    ),
+})
+_DEFAULT_INSTRUCTIONS = (
+    "Prepare all ingredients as specified",
+    "Follow cooking method for best results",
+    "Adjust seasoning to taste",
+    "Serve when ready",
+)
+
+# Shopping category for each known ingredient; anything else is filed under _DEFAULT_SHOPPING_CATEGORY
+_SHOPPING_CATEGORIES = (
+    ("proteins", ("chicken", "fish", "tofu", "eggs")),
+    ("vegetables", ("lettuce", "tomatoes", "carrots", "broccoli")),
+    ("fruits", ("apples", "bananas", "berries")),
+    ("grains", ("oats", "quinoa", "rice")),
+    ("dairy_alternatives", ("almond_milk", "coconut_yogurt")),
+    ("pantry_items", ("honey", "olive_oil", "vinegar")),
+    ("spices_herbs", ()),
+)
+_DEFAULT_SHOPPING_CATEGORY = "spices_herbs"
+_INGREDIENT_CATEGORY = MappingProxyType({
+    ingredient: category for category, ingredients in _SHOPPING_CATEGORIES for ingredient in ingredients
+})
+
+# Rough per-ingredient nutrition estimates; rows of a batch are ingredient counts times this vector
+_NUTRIENT_KEYS = ("calories", "protein", "carbohydrates", "fat", "fiber")
+_NUTRIENTS_PER_INGREDIENT = np.array([150, 8, 20, 5, 3], dtype=np.int64)
+
+
+def _restriction_mask(dietary_restrictions: List[str]) -> int:
+    """Fold dietary restrictions into a bitmask over _RESTRICTION_BITS"""
+    mask = 0
+    for restriction in dietary_restrictions:
+        mask |= _RESTRICTION_BITS.get(restriction, 0)
+    return mask
+
+
 class RecipeGeneratorAgent(BaseAgent):
     """
     Recipe Generator Agent responsible for:
@@ -24,8 +96,13 @@ class RecipeGeneratorAgent(BaseAgent):
         super().__init__("RecipeGeneratorAgent")
         self.recipe_templates = {}
         self.ingredient_substitutions = {}
+        self._first_substitutes = {}
         self.meal_categories = ["breakfast", "lunch", "dinner", "snacks"]
         
+        # Generated ids are unique per process: a startup epoch plus a running counter
+        self._id_counter = count()
+        self._id_epoch = int(time.time())
+        
         # Initialize recipe components
         self._initialize_recipe_templates()
         self._initialize_ingredient_substitutions()
@@ -76,6 +153,10 @@ class RecipeGeneratorAgent(BaseAgent):
             state["recipe_generation_error"] = error_response
             return state
     
+    def _next_id(self, prefix: str) -> str:
+        """Build a unique id for a generated recipe or meal plan"""
+        return f"{prefix}_{self._id_epoch}_{next(self._id_counter)}"
+    
     def _initialize_recipe_templates(self):
         """Initialize recipe templates for different meal types"""
         try:
@@ -146,6 +227,16 @@ class RecipeGeneratorAgent(BaseAgent):
                 }
             }
             
+            # Index which restrictions each template violates so suitability is a single AND
+            for templates in self.recipe_templates.values():
+                for template in templates.values():
+                    ingredient_set = frozenset(template["base_ingredients"]).union(template["optional_additions"])
+                    violated = 0
+                    for restriction, banned_ingredients in _RESTRICTION_BANS.items():
+                        if ingredient_set & banned_ingredients:
+                            violated |= _RESTRICTION_BITS[restriction]
+                    template["_violation_mask"] = violated
+            
             logger.info("Recipe templates initialized successfully")
             
         except Exception as e:
@@ -177,6 +268,13 @@ class RecipeGeneratorAgent(BaseAgent):
                 }
             }
             
+            # Flat (restriction, ingredient) -> first substitute map for adaptation
+            self._first_substitutes = {
+                (restriction, ingredient): alternatives[0]
+                for restriction, substitutions in self.ingredient_substitutions.items()
+                for ingredient, alternatives in substitutions.items()
+            }
+            
             logger.info("Ingredient substitutions initialized successfully")
             
         except Exception as e:
@@ -185,32 +283,26 @@ class RecipeGeneratorAgent(BaseAgent):
     async def _generate_recipes(self, user_id: str, diet_plan: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate recipes based on diet plan and user preferences"""
         try:
-            recipes = {}
-            
             # Extract meal information from diet plan
             meals = diet_plan.get("meals", [])
             dietary_restrictions = diet_plan.get("dietary_restrictions", [])
             nutritional_goals = diet_plan.get("nutritional_goals", {})
             
-            # Generate recipes for each meal category
-            for meal_category in self.meal_categories:
-                category_recipes = await self._generate_category_recipes(
-                    meal_category, meals, dietary_restrictions, nutritional_goals, user_data
-                )
-                recipes[meal_category] = category_recipes
+            # Meal categories are independent of each other, so generate them all
+            # at once, alongside the external suggestions lookup when MCP is available
+            pending = [
+                self._generate_category_recipes(meal_category, meals, dietary_restrictions, nutritional_goals, user_data)
+                for meal_category in self.meal_categories
+            ]
+            if self.mcp_client:
+                pending.append(self._get_external_suggestions(meals, dietary_restrictions))
+            results = await asyncio.gather(*pending)
+            
+            recipes = dict(zip(self.meal_categories, results))
             
             # Use MCP tools for enhanced recipe generation if available
-            if self.mcp_client:
-                try:
-                    # Get recipe suggestions from external APIs
-                    recipe_suggestions = await self.search_recipes(
-                        ingredients=meals,
-                        dietary_restrictions=dietary_restrictions
-                    )
-                    if recipe_suggestions.get("success"):
-                        recipes["external_suggestions"] = recipe_suggestions.get("result", {})
-                except Exception as e:
-                    logger.warning(f"Could not get external recipe suggestions: {str(e)}")
+            if self.mcp_client and results[-1] is not None:
+                recipes["external_suggestions"] = results[-1]
             
             logger.info(f"Generated {sum(len(recs) for recs in recipes.values())} recipes for user {user_id}")
             return recipes
@@ -219,6 +311,19 @@ class RecipeGeneratorAgent(BaseAgent):
             logger.error(f"Failed to generate recipes for user {user_id}: {str(e)}")
             return {}
     
+    async def _get_external_suggestions(self, meals: List[str], dietary_restrictions: List[str]) -> Optional[Dict[str, Any]]:
+        """Get recipe suggestions from external APIs through MCP"""
+        try:
+            recipe_suggestions = await self.search_recipes(
+                ingredients=meals,
+                dietary_restrictions=dietary_restrictions
+            )
+            if recipe_suggestions.get("success"):
+                return recipe_suggestions.get("result", {})
+        except Exception as e:
+            logger.warning(f"Could not get external recipe suggestions: {str(e)}")
+        return None
+    
     async def _generate_category_recipes(self, meal_category: str, meals: List[str], 
                                        dietary_restrictions: List[str], nutritional_goals: Dict[str, Any], 
                                        user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -228,15 +333,24 @@ class RecipeGeneratorAgent(BaseAgent):
             
             # Get templates for this category
             templates = self.recipe_templates.get(meal_category, {})
+            restriction_mask = _restriction_mask(dietary_restrictions)
             
             # Generate recipes based on available ingredients and restrictions
             for template_name, template in templates.items():
                 recipe = await self._create_recipe_from_template(
-                    template_name, template, meals, dietary_restrictions, nutritional_goals, user_data
+                    template_name, template, meals, dietary_restrictions, nutritional_goals, user_data,
+                    restriction_mask
                 )
                 if recipe:
                     category_recipes.append(recipe)
             
+            # Estimate nutrition for the whole category in one batch
+            nutritional_infos = self._calculate_nutritional_info_batch(
+                [recipe["ingredients"] for recipe in category_recipes]
+            )
+            for recipe, nutritional_info in zip(category_recipes, nutritional_infos):
+                recipe["nutritional_info"] = nutritional_info
+            
             # Generate additional custom recipes
             custom_recipes = await self._generate_custom_recipes(
                 meal_category, meals, dietary_restrictions, nutritional_goals
@@ -251,11 +365,12 @@ class RecipeGeneratorAgent(BaseAgent):
     
     async def _create_recipe_from_template(self, template_name: str, template: Dict[str, Any], 
                                          meals: List[str], dietary_restrictions: List[str], 
-                                         nutritional_goals: Dict[str, Any], user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                                         nutritional_goals: Dict[str, Any], user_data: Dict[str, Any],
+                                         restriction_mask: int) -> Optional[Dict[str, Any]]:
         """Create a recipe from a template"""
         try:
             # Check if template is suitable for dietary restrictions
-            if not self._is_template_suitable(template, dietary_restrictions):
+            if not self._is_template_suitable(template, restriction_mask):
                 return None
             
             # Adapt ingredients based on restrictions
@@ -265,7 +380,7 @@ class RecipeGeneratorAgent(BaseAgent):
             
             # Create recipe
             recipe = {
-                "recipe_id": f"recipe_{template_name}_{datetime.utcnow().timestamp()}",
+                "recipe_id": self._next_id(f"recipe_{template_name}"),
                 "name": template["name"],
                 "category": template_name,
                 "ingredients": adapted_ingredients,
@@ -273,8 +388,8 @@ class RecipeGeneratorAgent(BaseAgent):
                 "cooking_time": template["cooking_time"],
                 "difficulty": template["difficulty"],
                 "dietary_restrictions": dietary_restrictions,
-                "nutritional_info": await self._calculate_nutritional_info(adapted_ingredients),
-                "instructions": self._generate_cooking_instructions(template_name, adapted_ingredients),
+                "nutritional_info": {},  # Filled in per category by _generate_category_recipes
+                "instructions": self._generate_cooking_instructions(template_name),
                 "servings": 2,
                 "tags": self._generate_recipe_tags(template_name, dietary_restrictions)
             }
@@ -285,41 +400,21 @@ class RecipeGeneratorAgent(BaseAgent):
             logger.error(f"Failed to create recipe from template {template_name}: {str(e)}")
             return None
     
-    def _is_template_suitable(self, template: Dict[str, Any], dietary_restrictions: List[str]) -> bool:
-        """Check if template is suitable for dietary restrictions"""
-        try:
-            # Simple suitability check
-            # In production, this would be more sophisticated
-            
-            if "dairy_free" in dietary_restrictions:
-                dairy_ingredients = ["milk", "yogurt", "cheese"]
-                if any(ingredient in str(template) for ingredient in dairy_ingredients):
-                    return False
-            
-            if "gluten_free" in dietary_restrictions:
-                gluten_ingredients = ["bread", "pasta", "flour"]
-                if any(ingredient in str(template) for ingredient in gluten_ingredients):
-                    return False
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to check template suitability: {str(e)}")
-            return True
+    def _is_template_suitable(self, template: Dict[str, Any], restriction_mask: int) -> bool:
+        """Check if template is suitable for the caller's restriction mask"""
+        return (template["_violation_mask"] & restriction_mask) == 0
     
     def _adapt_ingredients_for_restrictions(self, ingredients: List[str], dietary_restrictions: List[str]) -> List[str]:
         """Adapt ingredients based on dietary restrictions"""
         try:
-            adapted_ingredients = ingredients.copy()
+            first_substitutes = self._first_substitutes
+            adapted_ingredients = []
             
-            for restriction in dietary_restrictions:
-                if restriction in self.ingredient_substitutions:
-                    substitutions = self.ingredient_substitutions[restriction]
-                    
-                    for i, ingredient in enumerate(adapted_ingredients):
-                        if ingredient in substitutions:
-                            # Replace with first available substitution
-                            adapted_ingredients[i] = substitutions[ingredient][0]
+            for ingredient in ingredients:
+                # Restrictions apply in order, each seeing the previous substitution
+                for restriction in dietary_restrictions:
+                    ingredient = first_substitutes.get((restriction, ingredient), ingredient)
+                adapted_ingredients.append(ingredient)
             
             return adapted_ingredients
             
@@ -327,68 +422,24 @@ class RecipeGeneratorAgent(BaseAgent):
             logger.error(f"Failed to adapt ingredients: {str(e)}")
             return ingredients
     
-    async def _calculate_nutritional_info(self, ingredients: List[str]) -> Dict[str, Any]:
+    def _calculate_nutritional_info(self, ingredients: List[str]) -> Dict[str, Any]:
         """Calculate nutritional information for recipe"""
-        try:
-            # This would typically use a nutrition database
-            # For now, return estimated values
-            
-            nutritional_info = {
-                "calories": len(ingredients) * 150,  # Rough estimate
-                "protein": len(ingredients) * 8,
-                "carbohydrates": len(ingredients) * 20,
-                "fat": len(ingredients) * 5,
-                "fiber": len(ingredients) * 3
-            }
-            
-            return nutritional_info
-            
-        except Exception as e:
-            logger.error(f"Failed to calculate nutritional info: {str(e)}")
-            return {}
+        return self._calculate_nutritional_info_batch([ingredients])[0]
+    
+    def _calculate_nutritional_info_batch(self, ingredient_lists: List[List[str]]) -> List[Dict[str, Any]]:
+        """Calculate nutritional information for several recipes at once"""
+        # This would typically use a nutrition database
+        # For now, return estimated values
+        counts = np.fromiter((len(ingredients) for ingredients in ingredient_lists), dtype=np.int64, count=len(ingredient_lists))
+        estimates = (counts[:, None] * _NUTRIENTS_PER_INGREDIENT).tolist()
+        return [dict(zip(_NUTRIENT_KEYS, row)) for row in estimates]
     
-    def _generate_cooking_instructions(self, template_name: str, ingredients: List[str]) -> List[str]:
+    def _generate_cooking_instructions(self, template_name: str) -> Tuple[str, ...]:
         """Generate cooking instructions for recipe"""
-        try:
-            instructions = []
-            
-            if "oatmeal" in template_name:
-                instructions = [
-                    "Bring milk to a gentle boil in a saucepan",
-                    "Add oats and reduce heat to low",
-                    "Cook for 5-7 minutes, stirring occasionally",
-                    "Add honey and optional toppings",
-                    "Serve hot"
-                ]
-            elif "smoothie" in template_name:
-                instructions = [
-                    "Add frozen fruits to blender",
-                    "Pour in yogurt and milk",
-                    "Blend until smooth",
-                    "Pour into bowl and add toppings",
-                    "Serve immediately"
-                ]
-            elif "salad" in template_name:
-                instructions = [
-                    "Cook quinoa according to package instructions",
-                    "Chop vegetables and prepare protein",
-                    "Combine all ingredients in a large bowl",
-                    "Add dressing and toss gently",
-                    "Serve chilled or at room temperature"
-                ]
-            else:
-                instructions = [
-                    "Prepare all ingredients as specified",
-                    "Follow cooking method for best results",
-                    "Adjust seasoning to taste",
-                    "Serve when ready"
-                ]
-            
-            return instructions
-            
-        except Exception as e:
-            logger.error(f"Failed to generate cooking instructions: {str(e)}")
-            return ["Follow standard cooking methods"]
+        for key, steps in _INSTRUCTION_TABLE.items():
+            if key in template_name:
+                return steps
+        return _DEFAULT_INSTRUCTIONS
     
     def _generate_recipe_tags(self, template_name: str, dietary_restrictions: List[str]) -> List[str]:
         """Generate tags for recipe categorization"""
@@ -429,7 +480,7 @@ class RecipeGeneratorAgent(BaseAgent):
             # Simple custom recipe generation
             if meal_category == "breakfast" and "eggs" in meals:
                 custom_recipes.append({
-                    "recipe_id": f"custom_breakfast_{datetime.utcnow().timestamp()}",
+                    "recipe_id": self._next_id("custom_breakfast"),
                     "name": "Scrambled Eggs with Vegetables",
                     "category": "custom",
                     "ingredients": ["eggs", "vegetables", "herbs"],
@@ -441,7 +492,7 @@ class RecipeGeneratorAgent(BaseAgent):
             
             elif meal_category == "lunch" and "chicken" in meals:
                 custom_recipes.append({
-                    "recipe_id": f"custom_lunch_{datetime.utcnow().timestamp()}",
+                    "recipe_id": self._next_id("custom_lunch"),
                     "name": "Grilled Chicken Salad",
                     "category": "custom",
                     "ingredients": ["chicken", "lettuce", "vegetables", "dressing"],
@@ -461,17 +512,17 @@ class RecipeGeneratorAgent(BaseAgent):
         """Create a comprehensive meal plan"""
         try:
             meal_plan = {
-                "plan_id": f"meal_plan_{datetime.utcnow().timestamp()}",
+                "plan_id": self._next_id("meal_plan"),
                 "created_at": datetime.utcnow().isoformat(),
                 "duration": "7 days",
                 "meals_per_day": 4,
                 "daily_plans": {}
             }
             
-            # Create daily meal plans
-            for day in range(1, 8):
-                daily_plan = await self._create_daily_plan(day, recipes, diet_plan)
-                meal_plan["daily_plans"][f"day_{day}"] = daily_plan
+            # Create daily meal plans; each day only reads the shared recipes
+            days = range(1, 8)
+            daily_plans = await asyncio.gather(*(self._create_daily_plan(day, recipes, diet_plan) for day in days))
+            meal_plan["daily_plans"] = {f"day_{day}": daily_plan for day, daily_plan in zip(days, daily_plans)}
             
             return meal_plan
             
@@ -513,16 +564,15 @@ class RecipeGeneratorAgent(BaseAgent):
             }
             
             # Collect all ingredients from recipes
-            all_ingredients = []
-            for category_recipes in recipes.values():
-                for recipe in category_recipes:
-                    all_ingredients.extend(recipe.get("ingredients", []))
-                    all_ingredients.extend(recipe.get("optional_ingredients", []))
+            all_ingredients = chain.from_iterable(
+                recipe.get(key, ())
+                for category_recipes in recipes.values()
+                for recipe in category_recipes
+                for key in ("ingredients", "optional_ingredients")
+            )
             
             # Count ingredient occurrences
-            ingredient_counts = {}
-            for ingredient in all_ingredients:
-                ingredient_counts[ingredient] = ingredient_counts.get(ingredient, 0) + 1
+            ingredient_counts = dict(Counter(all_ingredients))
             
             grocery_data["ingredients_summary"] = ingredient_counts
             
@@ -538,32 +588,11 @@ class RecipeGeneratorAgent(BaseAgent):
     def _categorize_ingredients(self, ingredient_counts: Dict[str, int]) -> Dict[str, List[str]]:
         """Categorize ingredients for shopping organization"""
         try:
-            categories = {
-                "proteins": [],
-                "vegetables": [],
-                "fruits": [],
-                "grains": [],
-                "dairy_alternatives": [],
-                "pantry_items": [],
-                "spices_herbs": []
-            }
+            categories = {category: [] for category, _ in _SHOPPING_CATEGORIES}
             
-            # Simple categorization logic
-            for ingredient, count in ingredient_counts.items():
-                if ingredient in ["chicken", "fish", "tofu", "eggs"]:
-                    categories["proteins"].append(ingredient)
-                elif ingredient in ["lettuce", "tomatoes", "carrots", "broccoli"]:
-                    categories["vegetables"].append(ingredient)
-                elif ingredient in ["apples", "bananas", "berries"]:
-                    categories["fruits"].append(ingredient)
-                elif ingredient in ["oats", "quinoa", "rice"]:
-                    categories["grains"].append(ingredient)
-                elif ingredient in ["almond_milk", "coconut_yogurt"]:
-                    categories["dairy_alternatives"].append(ingredient)
-                elif ingredient in ["honey", "olive_oil", "vinegar"]:
-                    categories["pantry_items"].append(ingredient)
-                else:
-                    categories["spices_herbs"].append(ingredient)
+            # One reverse-map probe per ingredient
+            for ingredient in ingredient_counts:
+                categories[_INGREDIENT_CATEGORY.get(ingredient, _DEFAULT_SHOPPING_CATEGORY)].append(ingredient)
             
             return categories
             
@@ -3,14 +3,67 @@ Supabase client configuration and authentication utilities
 """
 
 import os
-from typing import Optional, Dict, Any
+import asyncio
+from typing import Optional, Dict, Any, List, Sequence
 from datetime import datetime
+from decimal import Decimal
 from supabase import create_client, Client
 from supabase.lib.client_options import ClientOptions
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Columns written by the bulk COPY path for food items, in record order
+FOOD_ITEM_COLUMNS = ("meal_id", "food_name", "quantity", "unit", "calories", "protein", "carbs", "fat", "fiber")
+
+# Global asyncpg pool used for direct Postgres writes (created lazily)
+_pg_pool = None
+_pg_pool_unavailable = False  # Set only when the pool can never be created in this process
+_pg_pool_lock = asyncio.Lock()
+
+async def get_pg_pool():
+    """
+    Get the shared asyncpg connection pool, creating it on first use.
+    
+    Returns None when asyncpg is not installed, DATABASE_URL is not set or
+    the database cannot be reached right now, in which case callers should
+    fall back to PostgREST. A failed connection is retried on the next call.
+    """
+    global _pg_pool, _pg_pool_unavailable
+    if _pg_pool is not None or _pg_pool_unavailable:
+        return _pg_pool
+    
+    async with _pg_pool_lock:
+        # Another caller may have settled the pool while we waited for the lock
+        if _pg_pool is not None or _pg_pool_unavailable:
+            return _pg_pool
+        
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            _pg_pool_unavailable = True
+            return None
+        
+        try:
+            import asyncpg
+        except ImportError:
+            logger.warning("⚠️ asyncpg not installed, using PostgREST for bulk writes")
+            _pg_pool_unavailable = True
+            return None
+        
+        try:
+            _pg_pool = await asyncpg.create_pool(database_url, min_size=1, max_size=5)
+            logger.info("✅ asyncpg pool initialized for bulk writes")
+        except Exception as e:
+            logger.warning(f"⚠️ asyncpg pool not available, using PostgREST for bulk writes: {str(e)}")
+    return _pg_pool
+
+async def close_pg_pool():
+    """Close the shared asyncpg pool if it was created"""
+    global _pg_pool
+    if _pg_pool is not None:
+        await _pg_pool.close()
+        _pg_pool = None
+
 class SupabaseManager:
     """Manages Supabase client and authentication operations"""
     
@@ -614,6 +667,69 @@ class SupabaseManager:
                 "error": str(e)
             }
     
+    async def bulk_create_food_items(self, rows: Sequence[Sequence[Any]]) -> Dict[str, Any]:
+        """
+        Create many food item entries in one round trip
+        
+        Uses Postgres COPY through asyncpg when a direct connection is configured,
+        otherwise falls back to a single batched PostgREST insert. If the batch
+        is rejected (e.g. one row breaks a CHECK constraint), the rows are
+        inserted one by one so a single bad item does not drop the others.
+        
+        Args:
+            rows: Records ordered as FOOD_ITEM_COLUMNS
+            
+        Returns:
+            Creation result with the number of inserted rows
+        """
+        if not rows:
+            return {"success": True, "inserted": 0}
+        
+        try:
+            pool = await get_pg_pool()
+            if pool is not None:
+                records = [
+                    (meal_id, food_name, Decimal(str(quantity)), unit, int(round(calories)),
+                     Decimal(str(protein)), Decimal(str(carbs)), Decimal(str(fat)), Decimal(str(fiber)))
+                    for meal_id, food_name, quantity, unit, calories, protein, carbs, fat, fiber in rows
+                ]
+                async with pool.acquire() as conn:
+                    await conn.copy_records_to_table("food_items", records=records, columns=FOOD_ITEM_COLUMNS)
+            else:
+                payload: List[Dict[str, Any]] = [dict(zip(FOOD_ITEM_COLUMNS, row)) for row in rows]
+                self.client.table("food_items").insert(payload).execute()
+            
+            logger.info(f"✅ Bulk created {len(rows)} food items")
+            return {
+                "success": True,
+                "inserted": len(rows),
+                "message": "Food items created successfully"
+            }
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Bulk food item write failed, inserting rows individually: {str(e)}")
+        
+        # Row-by-row fallback: each item succeeds or fails on its own
+        inserted = 0
+        for meal_id, *values in rows:
+            result = await self.create_food_item(meal_id, dict(zip(FOOD_ITEM_COLUMNS[1:], values)))
+            if result["success"]:
+                inserted += 1
+        
+        if inserted < len(rows):
+            logger.error(f"❌ Failed to create {len(rows) - inserted} of {len(rows)} food items")
+            return {
+                "success": False,
+                "inserted": inserted,
+                "error": f"Failed to create {len(rows) - inserted} of {len(rows)} food items"
+            }
+        
+        return {
+            "success": True,
+            "inserted": inserted,
+            "message": "Food items created successfully"
+        }
+    
     async def get_user_diet_plans(self, user_id: str) -> Dict[str, Any]:
         """
         Get all diet plans for a user
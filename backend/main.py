@@ -72,6 +72,11 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("🛑 Shutting down AI Dietitian Agent System...")
+    try:
+        from app.core.supabase import close_pg_pool
+        await close_pg_pool()
+    except Exception as e:
+        print(f"⚠️ Warning: Could not close database pool: {e}")
 
 # Create FastAPI app
 app = FastAPI(
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk food item creation
+
+Runs against stubbed Supabase and asyncpg clients, so no database or
+environment variables are needed.
+"""
+
+import asyncio
+import os
+import sys
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+import app.core.supabase as supabase_module
+from app.core.supabase import SupabaseManager, FOOD_ITEM_COLUMNS
+
+GOOD_ROW = ("meal-1", "Oats", 50, "g", 190, 6.5, 33, 3.2, 5)
+BAD_UNIT_ROW = ("meal-1", "Mystery", 1, "handful", 0, 0, 0, 0, 0)
+GOOD_ROW_2 = ("meal-2", "Milk", 240, "ml", 150, 8, 12, 8, 0)
+
+
+class FakeQuery:
+    """Stub for client.table(...).insert(...).execute()"""
+
+    def __init__(self, table: "FakeTable", payload):
+        self.table = table
+        self.payload = payload
+
+    def execute(self):
+        if isinstance(self.payload, list):
+            self.table.batch_calls += 1
+            if self.table.reject_batch:
+                raise RuntimeError("new row violates check constraint \"food_items_unit_check\"")
+            self.table.rows.extend(self.payload)
+            return type("Response", (), {"data": [{"food_id": f"food-{i}"} for i in range(len(self.payload))]})()
+
+        # Single-row insert; mimic the unit CHECK constraint
+        if self.payload["unit"] not in ("g", "ml", "pieces", "cups", "tbsp", "tsp", "medium", "large", "small"):
+            raise RuntimeError("new row violates check constraint \"food_items_unit_check\"")
+        self.table.rows.append(self.payload)
+        return type("Response", (), {"data": [{"food_id": f"food-{len(self.table.rows)}"}]})()
+
+
+class FakeTable:
+    def __init__(self, reject_batch: bool):
+        self.reject_batch = reject_batch
+        self.batch_calls = 0
+        self.rows = []
+
+    def insert(self, payload):
+        return FakeQuery(self, payload)
+
+
+class FakeClient:
+    def __init__(self, reject_batch: bool = False):
+        self.food_items = FakeTable(reject_batch)
+
+    def table(self, name: str) -> FakeTable:
+        assert name == "food_items"
+        return self.food_items
+
+
+class FakeConnection:
+    def __init__(self, reject: bool):
+        self.reject = reject
+        self.copied = []
+
+    async def copy_records_to_table(self, table_name, records, columns):
+        assert table_name == "food_items"
+        assert tuple(columns) == FOOD_ITEM_COLUMNS
+        if self.reject:
+            raise RuntimeError("COPY rejected by check constraint")
+        self.copied.extend(records)
+
+
+class FakePool:
+    def __init__(self, reject: bool = False):
+        self.connection = FakeConnection(reject)
+
+    def acquire(self):
+        pool = self
+
+        class Acquire:
+            async def __aenter__(self):
+                return pool.connection
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Acquire()
+
+
+def make_manager(client: FakeClient) -> SupabaseManager:
+    """SupabaseManager wired to a stub client instead of a real connection"""
+    manager = SupabaseManager()
+    manager._client = client
+    manager._initialized = True
+    return manager
+
+
+def run(coro, pool=None):
+    """Run a bulk write with get_pg_pool returning the given stub pool"""
+    async def get_pg_pool():
+        return pool
+
+    original = supabase_module.get_pg_pool
+    supabase_module.get_pg_pool = get_pg_pool
+    try:
+        return asyncio.run(coro)
+    finally:
+        supabase_module.get_pg_pool = original
+
+
+def test_batch_insert_through_postgrest():
+    """Without a direct connection all rows go in one PostgREST insert"""
+    client = FakeClient()
+    manager = make_manager(client)
+
+    result = run(manager.bulk_create_food_items([GOOD_ROW, GOOD_ROW_2]))
+
+    assert result["success"] is True
+    assert result["inserted"] == 2
+    assert client.food_items.batch_calls == 1
+    assert client.food_items.rows[0] == dict(zip(FOOD_ITEM_COLUMNS, GOOD_ROW))
+
+
+def test_rejected_batch_falls_back_to_row_inserts():
+    """One bad row must not drop the good ones when the batch is rejected"""
+    client = FakeClient(reject_batch=True)
+    manager = make_manager(client)
+
+    result = run(manager.bulk_create_food_items([GOOD_ROW, BAD_UNIT_ROW, GOOD_ROW_2]))
+
+    assert result["success"] is False
+    assert result["inserted"] == 2
+    assert result["error"] == "Failed to create 1 of 3 food items"
+    assert [row["food_name"] for row in client.food_items.rows] == ["Oats", "Milk"]
+    assert [row["meal_id"] for row in client.food_items.rows] == ["meal-1", "meal-2"]
+
+
+def test_copy_path_converts_numeric_columns():
+    """The COPY path sends Decimal/int values in FOOD_ITEM_COLUMNS order"""
+    client = FakeClient()
+    pool = FakePool()
+    manager = make_manager(client)
+
+    result = run(manager.bulk_create_food_items([GOOD_ROW]), pool)
+
+    assert result == {"success": True, "inserted": 1, "message": "Food items created successfully"}
+    assert client.food_items.batch_calls == 0
+    record = pool.connection.copied[0]
+    assert record[:2] == ("meal-1", "Oats")
+    assert str(record[2]) == "50" and record[3] == "g" and record[4] == 190
+    assert str(record[5]) == "6.5"
+
+
+def test_rejected_copy_falls_back_to_row_inserts():
+    """A COPY rejected by the database still inserts the valid rows one by one"""
+    client = FakeClient()
+    manager = make_manager(client)
+
+    result = run(manager.bulk_create_food_items([GOOD_ROW, BAD_UNIT_ROW]), FakePool(reject=True))
+
+    assert result["success"] is False
+    assert result["inserted"] == 1
+    assert [row["food_name"] for row in client.food_items.rows] == ["Oats"]
+
+
+def test_empty_rows_skip_the_database():
+    client = FakeClient()
+    manager = make_manager(client)
+
+    assert run(manager.bulk_create_food_items([])) == {"success": True, "inserted": 0}
+    assert client.food_items.batch_calls == 0
+
+
+if __name__ == "__main__":
+    print("🧪 Testing bulk food item creation")
+    print("=" * 50)
+
+    for test in (
+        test_batch_insert_through_postgrest,
+        test_rejected_batch_falls_back_to_row_inserts,
+        test_copy_path_converts_numeric_columns,
+        test_rejected_copy_falls_back_to_row_inserts,
+        test_empty_rows_skip_the_database
+    ):
+        test()
+        print(f"✅ {test.__name__}")
+
+    print("\n🎉 All bulk food item tests passed")